@@ -2,75 +2,196 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from backend.db import init_db, session_scope, Draw
+from backend.store import DrawStore
 from backend.sync import import_csv
-from backend.analysis import dataframe_from_draws
-from backend.generator import gen_numbers
+from backend.analysis import dataframe_from_store, freq_table, miss_table, block_hit_matrix, bucket_matrix
+from backend.generator import gen_numbers, number_weights
+from backend.prize import check_prize
+from backend.stats import randomness_tests
+from backend.filters import filter_frame, filter_store, spec_hash
+from backend.client import ApiClient, API_URL_ENV
+from backend.export import export_draws, export_tickets, infer_format
+import os
 import random
+import tempfile
+
+EXPORT_DOWNLOAD_MAX_MB = 200  # 下载按钮需把文件整体读入内存，超过此大小只保留在本机临时目录
+EXPORT_FORMAT_MIME = {"csv": "text/csv", "csv.gz": "application/gzip", "parquet": "application/octet-stream"}
 
 st.set_page_config(page_title="大乐透分析与选号", page_icon="🎯", layout="wide")
 st.title("🎯 大乐透分析与选号（本地版）")
 
+front_bins = [(1,5),(6,10),(11,15),(16,20),(21,25),(26,30),(31,35)]
+front_labels = ["1-5","6-10","11-15","16-20","21-25","26-30","31-35"]
+back_bins = [(1,2),(3,4),(5,6),(7,8),(9,12)]
+back_labels = ["1-2","3-4","5-6","7-8","9-12"]
+
+def parse_nums(s: str):
+    s = s.replace("，", ",")
+    return [int(x.strip()) for x in s.split(",") if x.strip().isdigit()]
+
+def narrowed(value, lo, hi):
+    # 滑块区间未收窄时不加条件；贴边的一端视为不限
+    a, b = value
+    if (a, b) == (lo, hi):
+        return None
+    return [a if a > lo else None, b if b < hi else None]
+
 # --------------------- 数据筛选器 ---------------------
 st.sidebar.header("🔎 数据筛选器（全局）")
-start_issue = st.sidebar.text_input("起始期号", value="")
-end_issue = st.sidebar.text_input("结束期号", value="")
+start_issue = st.sidebar.text_input("起始期号", value="").strip()
+end_issue = st.sidebar.text_input("结束期号", value="").strip()
 start_date = st.sidebar.date_input("起始日期", value=None)
 end_date = st.sidebar.date_input("结束日期", value=None)
 recent_n = st.sidebar.number_input("最近 N 期", min_value=0, max_value=500, value=0)
+for label, issue in (("起始期号", start_issue), ("结束期号", end_issue)):
+    if issue and not issue.isdigit():
+        st.sidebar.error(f"{label}须为数字，已忽略")
+start_issue = start_issue if start_issue.isdigit() else ""
+end_issue = end_issue if end_issue.isdigit() else ""
+
+with st.sidebar.expander("组合条件（多条件同时满足）"):
+    cond_sum = st.slider("前区和值", 15, 165, (15, 165))
+    cond_odd = st.slider("前区奇数个数", 0, 5, (0, 5))
+    cond_span = st.slider("前区跨度", 4, 34, (4, 34))
+    cond_cons = st.slider("前区连号对数", 0, 4, (0, 4))
+    cond_omission = st.slider("本期号码开出前最大遗漏", 0, 100, (0, 100), help="右端取 100 表示不限")
+    cond_front_inc = st.text_input("前区包含(逗号分隔)", "", key="cond_front_inc")
+    cond_front_exc = st.text_input("前区不含(逗号分隔)", "", key="cond_front_exc")
+    cond_back_inc = st.text_input("后区包含(逗号分隔)", "", key="cond_back_inc")
+    cond_back_exc = st.text_input("后区不含(逗号分隔)", "", key="cond_back_exc")
+    cond_blocks = st.text_input("前区区块个数（依次对应 " + ",".join(front_labels) + "，留空或 * 表示不限）", "")
 
-def filter_df(df, start_issue="", end_issue="", start_date=None, end_date=None, recent_n=0):
-    df_filtered = df.copy()
-    if start_issue:
-        df_filtered = df_filtered[df_filtered['issue'] >= start_issue]
-    if end_issue:
-        df_filtered = df_filtered[df_filtered['issue'] <= end_issue]
-    if start_date:
-        df_filtered = df_filtered[df_filtered['date'] >= pd.to_datetime(start_date)]
-    if end_date:
-        df_filtered = df_filtered[df_filtered['date'] <= pd.to_datetime(end_date)]
-    if recent_n > 0:
-        df_filtered = df_filtered.sort_values("date", ascending=False).head(recent_n)
-    return df_filtered
+filter_spec = {
+    "start_issue": start_issue, "end_issue": end_issue,
+    "start_date": start_date, "end_date": end_date, "recent_n": recent_n,
+    "sum_front": narrowed(cond_sum, 15, 165),
+    "front_odd": narrowed(cond_odd, 0, 5),
+    "span": narrowed(cond_span, 4, 34),
+    "consecutive": narrowed(cond_cons, 0, 4),
+    "max_omission": narrowed(cond_omission, 0, 100),
+    "front_include": parse_nums(cond_front_inc),
+    "front_exclude": parse_nums(cond_front_exc),
+    "back_include": parse_nums(cond_back_inc),
+    "back_exclude": parse_nums(cond_back_exc),
+    "blocks": {label: int(v) for label, v in zip(front_labels, cond_blocks.replace("，", ",").split(","))
+               if v.strip().isdigit()},
+}
 
 # --------------------- 初始化数据库 ---------------------
-init_db()
-with session_scope() as s:
-    rows = [dict(
-        issue=d.issue, date=d.date.isoformat(),
-        f1=d.f1, f2=d.f2, f3=d.f3, f4=d.f4, f5=d.f5,
-        b1=d.b1, b2=d.b2,
-        sales=d.sales, pool=d.pool
-    ) for d in s.query(Draw).order_by(Draw.issue.desc()).all()]
-
-if not rows:
+# 设置 DLT_API_URL 时作为 backend.service 的瘦客户端，共享服务端缓存
+@st.cache_resource
+def api_client():
+    # 跨重跑复用同一客户端，才能带 If-None-Match 复用上次响应
+    return ApiClient()
+
+api = api_client() if os.environ.get(API_URL_ENV) else None
+if api:
+    store = None
+    df = api.dataframe()
+else:
+    store = DrawStore.load()
+    df = dataframe_from_store(store)
+
+if df.empty:
     st.warning("数据库暂无数据，请先导入 CSV。")
     st.stop()
 
-df = dataframe_from_draws(rows)
-df_filtered = filter_df(df, start_issue, end_issue, start_date, end_date, recent_n)
+df_filtered = filter_frame(df, filter_spec)
+
+def freq_miss():
+    # 频次/遗漏：瘦客户端模式下由服务端 /stats 计算并缓存
+    if api:
+        return api.freq_miss(filter_spec)
+    # 本地模式直接在 DrawStore 的号码视图上统计（筛选掩码与 df_filtered 共用缓存）
+    selected = filter_store(store, filter_spec)
+    return freq_table(selected), miss_table(selected)
 
 # --------------------- Tabs ---------------------
 tab_data, tab_chart, tab_generate = st.tabs(["📂 数据管理", "📊 数据图表", "🔢 号码生成"])
 
-front_bins = [(1,5),(6,10),(11,15),(16,20),(21,25),(26,30),(31,35)]
-front_labels = ["1-5","6-10","11-15","16-20","21-25","26-30","31-35"]
-back_bins = [(1,2),(3,4),(5,6),(7,8),(9,12)]
-back_labels = ["1-2","3-4","5-6","7-8","9-12"]
+EXPORT_FORMATS = list(EXPORT_FORMAT_MIME)
+
+EXPORT_NOTE = (f"浏览器下载上限 {EXPORT_DOWNLOAD_MAX_MB} MB；更大的文件保留在本机临时目录，"
+               "也可用命令行 python -m backend.export 直接导出。")
+
+def prepare_export(kind, filename, write, unit):
+    """
+    write(path) 将数据按块流式写到本会话独立的临时文件。
+    下载按钮只在生成的这一次运行中渲染，之后的重跑不会再读取文件。
+    """
+    old = st.session_state.pop(f"export_{kind}", None)
+    if old and os.path.exists(old):
+        os.remove(old)
+    fd, path = tempfile.mkstemp(prefix=f"dlt_{kind}_", suffix="." + infer_format(filename))
+    os.close(fd)
+    try:
+        with st.spinner("正在分块生成并写出……"):
+            n = write(path)
+    except Exception as e:
+        os.remove(path)
+        st.error(f"导出失败：{e}")
+        return
+    size_mb = os.path.getsize(path) / 2**20
+    if size_mb > EXPORT_DOWNLOAD_MAX_MB:
+        st.session_state[f"export_{kind}"] = path  # 下次导出时清理
+        st.info(f"已导出 {n} {unit}（{size_mb:.0f} MB），超过下载上限，文件保存在：{path}")
+        return
+    with open(path, "rb") as f:
+        st.download_button(f"下载 {filename}（{n} {unit}，{size_mb:.1f} MB）", f, file_name=filename,
+                           mime=EXPORT_FORMAT_MIME[infer_format(filename)], key=f"download_{kind}",
+                           on_click="ignore")
+    os.remove(path)
 
 # --------------------- Tab1: 数据管理 ---------------------
 with tab_data:
     with st.expander("CSV 导入", expanded=True):
-        csv_file = st.file_uploader("选择 CSV 文件", type=["csv"])
+        csv_file = st.file_uploader("选择 CSV 文件（支持 .csv.gz）", type=["csv", "gz"])
         if csv_file and st.button("导入 CSV 数据"):
             try:
                 n = import_csv(csv_file)
                 st.success(f"导入 {n} 条数据")
             except Exception as e:
                 st.error(f"导入失败：{e}")
+    with st.expander("导出历史数据（按侧栏全部筛选条件）"):
+        if api:
+            # 导出直接读本机 SQLite，可能与服务端数据不一致
+            st.info("瘦客户端模式下数据来自 API 服务，请在服务端运行 python -m backend.export draws 导出历史数据。")
+        else:
+            col_f, col_x = st.columns(2)
+            draws_fmt = col_f.selectbox("导出格式", EXPORT_FORMATS, key="draws_fmt")
+            draws_features = col_x.checkbox("附带衍生指标（和值/奇偶等）", False)
+            st.caption(EXPORT_NOTE)
+            if st.button("生成历史导出文件"):
+                prepare_export("draws", f"dlt_history.{draws_fmt}", lambda path: export_draws(
+                    path, draws_fmt, features=draws_features, spec=filter_spec), "期")
     st.subheader(f"数据表（共 {len(df_filtered)} 条）")
     st.dataframe(df_filtered.head(50), use_container_width=True)
 
+HEATMAP_MAX_ROWS = 60           # 单张热力图最多行数（期或桶）
+HEATMAP_TEXT_MAX_CELLS = 400    # 超过该格数不再显示文字标注
+
+def heatmap_row_count(data, mode, size):
+    if mode == "按月聚合":
+        return data["date"].dt.to_period("M").nunique()
+    if mode == "逐期分页":
+        return len(data)
+    return -(-len(data) // max(1, size))
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def block_heatmap(data, bins, labels, mode, size, page, color_scale):
+    cols = [c for c in data.columns if c not in ("issue", "date")]
+    matrix = block_hit_matrix(data, cols, bins, labels)
+    if mode == "按月聚合":
+        matrix = bucket_matrix(matrix, by="month", dates=data["date"])
+    elif mode != "逐期分页" and size > 1:
+        matrix = bucket_matrix(matrix, by="issues", size=size)
+    matrix = matrix.iloc[page*HEATMAP_MAX_ROWS:(page+1)*HEATMAP_MAX_ROWS]
+    y_label = "期号" if mode == "逐期分页" or (mode == "自动" and size <= 1) else ("月份" if mode == "按月聚合" else "期号区间")
+    color_label = "落点" if y_label == "期号" else "落点比例"
+    return px.imshow(matrix, text_auto=matrix.size <= HEATMAP_TEXT_MAX_CELLS, aspect="auto",
+                     color_continuous_scale=color_scale, labels=dict(x="区块", y=y_label, color=color_label))
+
 # --------------------- Tab2: 数据图表 ---------------------
 with tab_chart:
     st.subheader("前区落点统计")
@@ -91,30 +212,45 @@ with tab_chart:
     fig_back = px.bar(df_back, x="区间", y="次数", text="次数", color="次数", color_continuous_scale="Reds")
     st.plotly_chart(fig_back, use_container_width=True)
 
-    # 每期区块落点矩阵
-    st.subheader("每期区块落点热力图（前区）")
-    front_matrix = pd.DataFrame(0, index=df_filtered['issue'], columns=front_labels)
-    for _, row in df_filtered.iterrows():
-        for col in ["f1","f2","f3","f4","f5"]:
-            val = row[col]
-            for i,(lo,hi) in enumerate(front_bins):
-                if lo <= val <= hi:
-                    front_matrix.at[row['issue'], front_labels[i]] = 1
-    fig_front_matrix = px.imshow(front_matrix, text_auto=True, color_continuous_scale="Blues",
-                                 labels=dict(x="区块",y="期号",color="落点"))
-    st.plotly_chart(fig_front_matrix, use_container_width=True)
-
-    st.subheader("每期区块落点热力图（后区）")
-    back_matrix = pd.DataFrame(0, index=df_filtered['issue'], columns=back_labels)
-    for _, row in df_filtered.iterrows():
-        for col in ["b1","b2"]:
-            val = row[col]
-            for i,(lo,hi) in enumerate(back_bins):
-                if lo <= val <= hi:
-                    back_matrix.at[row['issue'], back_labels[i]] = 1
-    fig_back_matrix = px.imshow(back_matrix, text_auto=True, color_continuous_scale="Reds",
-                                labels=dict(x="区块",y="期号",color="落点"))
-    st.plotly_chart(fig_back_matrix, use_container_width=True)
+    st.subheader("冷热号与随机性检验")
+    freq, _ = freq_miss()
+    df_hot = freq["front"].reindex(range(1,36), fill_value=0).rename_axis("号码").reset_index(name="次数")
+    fig_hot = px.bar(df_hot, x="号码", y="次数", color="次数", color_continuous_scale="OrRd")
+    st.plotly_chart(fig_hot, use_container_width=True)
+    # 蒙特卡洛检验耗时数秒，只在点击时运行；结果保存在会话中，筛选条件变化后提示重新运行
+    col_s, col_r = st.columns([3, 1])
+    n_sims = col_s.select_slider("蒙特卡洛模拟次数", options=[200, 500, 1000, 2000, 5000], value=1000)
+    if col_r.button("运行随机性检验"):
+        with st.spinner("正在计算蒙特卡洛 p 值……"):
+            st.session_state["randomness"] = (spec_hash(filter_spec), n_sims,
+                                              randomness_tests(df_filtered, n_sims=n_sims))
+    done = st.session_state.get("randomness")
+    if done:
+        if done[0] != spec_hash(filter_spec):
+            st.info("筛选条件已变化，以下为上次运行的结果，点击按钮重新检验。")
+        st.dataframe(done[2], use_container_width=True, hide_index=True)
+        st.caption(f"模拟 {done[1]} 次。p 值 < 0.05 表示该指标在筛选数据上偏离纯随机开奖；否则观察到的冷热差异可由随机波动解释。")
+
+    # 每期区块落点矩阵：服务端分页/聚合，控制发送到浏览器的图表大小
+    st.subheader("每期区块落点热力图")
+    heat_mode = st.radio("显示方式", ["自动", "逐期分页", "按 N 期聚合", "按月聚合"], horizontal=True)
+    heat_size = 10
+    if heat_mode == "按 N 期聚合":
+        heat_size = st.number_input("每桶期数 N", min_value=2, max_value=1000, value=10)
+    elif heat_mode == "自动":
+        heat_size = max(1, -(-len(df_filtered) // HEATMAP_MAX_ROWS))
+    heat_rows = heatmap_row_count(df_filtered, heat_mode, heat_size)
+    heat_pages = max(1, -(-heat_rows // HEATMAP_MAX_ROWS))
+    heat_page = 0
+    if heat_pages > 1:
+        heat_page = st.number_input(f"页码（共 {heat_pages} 页）", min_value=1, max_value=heat_pages, value=1) - 1
+
+    st.markdown("**前区**")
+    st.plotly_chart(block_heatmap(df_filtered[["issue","date","f1","f2","f3","f4","f5"]], front_bins, front_labels,
+                                  heat_mode, heat_size, heat_page, "Blues"), use_container_width=True)
+    st.markdown("**后区**")
+    st.plotly_chart(block_heatmap(df_filtered[["issue","date","b1","b2"]], back_bins, back_labels,
+                                  heat_mode, heat_size, heat_page, "Reds"), use_container_width=True)
 
 # --------------------- Tab3: 号码生成 ---------------------
 with tab_generate:
@@ -170,9 +306,19 @@ with tab_generate:
     max_gen = st.number_input("生成注数上限", 1, 100, 20)
     use_block_weight = st.checkbox("使用区块权重", True)
 
-    def parse_nums(s: str):
-        s = s.replace("，", ",")
-        return [int(x.strip()) for x in s.split(",") if x.strip().isdigit()]
+    hot_cold_modes = {"不使用": None, "热号优先": "hot", "冷号优先": "cold", "冷热混合": "mixed"}
+    colH, colT = st.columns(2)
+    hot_cold_label = colH.selectbox("号码冷热权重（基于当前筛选数据，优先于区块权重）", list(hot_cold_modes))
+    temperature = colT.slider("温度（越大越接近均匀）", 0.1, 5.0, 1.0, 0.1)
+    front_num_weights = back_num_weights = None
+    if hot_cold_modes[hot_cold_label] and df_filtered.empty:
+        st.warning("当前筛选数据为空，冷热权重不生效")
+    elif hot_cold_modes[hot_cold_label]:
+        freq, miss = freq_miss()
+        front_num_weights = number_weights(freq["front"].to_dict(), miss["front"].to_dict(),
+                                           hot_cold_modes[hot_cold_label], temperature)
+        back_num_weights = number_weights(freq["back"].to_dict(), miss["back"].to_dict(),
+                                          hot_cold_modes[hot_cold_label], temperature)
 
     rules = {
         "sum_front_range": [sum_min, sum_max],
@@ -185,6 +331,16 @@ with tab_generate:
         "consecutive_mode": consecutive_mode
     }
 
+    with st.expander("按当前规则导出大批量号码本"):
+        col_n, col_f = st.columns(2)
+        book_count = col_n.number_input("注数", 1, 10_000_000, 100_000, step=10_000)
+        book_fmt = col_f.selectbox("导出格式", EXPORT_FORMATS, key="book_fmt")
+        st.caption(EXPORT_NOTE)
+        if st.button("生成号码本导出文件"):
+            prepare_export("tickets", f"dlt_tickets.{book_fmt}", lambda path: export_tickets(
+                path, book_count, book_fmt, rules=rules, front_pool_user=front_pool, back_pool_user=back_pool,
+                front_num_weights=front_num_weights, back_num_weights=back_num_weights), "注")
+
     # --------------------- 中奖号码比对 ---------------------
     st.subheader("🎯 中奖号码比对")
     win_front_input = st.text_input("中奖前区号码（逗号分隔）", "")
@@ -205,34 +361,6 @@ with tab_generate:
         "未中奖":"white"
     }
 
-    def check_prize(gen_front, gen_back, win_front, win_back):
-        fc = len(set(gen_front) & set(win_front))
-        bc = len(set(gen_back) & set(win_back))
-        if fc == 5 and bc == 2:
-            return "一等奖 1000W"
-        elif fc == 5 and bc == 1:
-            return "二等奖 500W"
-        elif fc == 5:
-            return "三等奖 1W"
-        elif fc == 4 and bc == 2:
-            return "四等奖 3K"
-        elif fc == 4 and bc == 1:
-            return "五等奖 300"
-        elif fc == 3 and bc == 2:
-            return "六等奖 200"
-        elif fc == 4:
-            return "七等奖 100"
-        elif fc == 3 and bc == 1:
-            return "八等奖"
-        elif fc == 2 and bc == 2:
-            return "八等奖"
-        elif fc == 1 and bc == 2:
-            return "九等奖"
-        elif bc == 2:
-            return "九等奖"
-        else:
-            return "未中奖"
-
     if st.button("生成号码并比对"):
         win_front = parse_nums(win_front_input)
         win_back = parse_nums(win_back_input)
@@ -245,7 +373,9 @@ with tab_generate:
             back_blocks={label:list(range(lo,hi+1)) for label,(lo,hi) in zip(back_labels,back_bins)},
             front_weights=front_weights,
             back_weights=back_weights,
-            use_block_weight=use_block_weight
+            use_block_weight=use_block_weight,
+            front_num_weights=front_num_weights,
+            back_num_weights=back_num_weights
         )
         for i, cd in enumerate(cands,1):
             prize = check_prize(cd['front'], cd['back'], win_front, win_back)
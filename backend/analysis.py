@@ -1,6 +1,7 @@
 
 from __future__ import annotations
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
 import pandas as pd
 
 def dataframe_from_draws(rows:List[dict]) -> pd.DataFrame:
@@ -9,31 +10,85 @@ def dataframe_from_draws(rows:List[dict]) -> pd.DataFrame:
     num_cols = ["f1","f2","f3","f4","f5","b1","b2"]
     for c in num_cols:
         df[c] = df[c].astype(int)
+    return add_features(df)
+
+def dataframe_from_store(store) -> pd.DataFrame:
+    # 由 DrawStore 直接构造，跳过逐行 dict
+    return add_features(store.to_frame())
+
+def add_features(df:pd.DataFrame) -> pd.DataFrame:
     # 衍生指标
     df["sum_front"] = df[["f1","f2","f3","f4","f5"]].sum(axis=1)
     df["sum_back"] = df[["b1","b2"]].sum(axis=1)
     df["sum_all"] = df["sum_front"] + df["sum_back"]
-    df["odd_count"] = df[["f1","f2","f3","f4","f5","b1","b2"]].apply(lambda r: sum(x%2 for x in r), axis=1)
+    df["odd_count"] = (df[["f1","f2","f3","f4","f5","b1","b2"]] % 2).sum(axis=1)
     return df
 
-def freq_table(df:pd.DataFrame) -> Dict[str, pd.Series]:
-    front = pd.concat([df[c] for c in ["f1","f2","f3","f4","f5"]]).value_counts().sort_index()
-    back = pd.concat([df[c] for c in ["b1","b2"]]).value_counts().sort_index()
-    return {"front": front, "back": back}
-
-def miss_table(df:pd.DataFrame) -> Dict[str, pd.Series]:
-    # 简单遗漏：从最近一期向前数，距离上次出现的期数
-    def last_seen(series:pd.Series, pool:range) -> pd.Series:
-        last = {n: None for n in pool}
-        miss = {n: 0 for n in pool}
-        for idx, nums in enumerate(series[::-1], start=0):
-            for n in pool:
-                if n in nums:
-                    last[n] = idx
-        return pd.Series({n: (last[n] if last[n] is not None else len(series)) for n in pool}).sort_index()
-
-    arr_front = list(zip(df["f1"],df["f2"],df["f3"],df["f4"],df["f5"]))
-    arr_back = list(zip(df["b1"],df["b2"]))
-    miss_front = last_seen(pd.Series(arr_front), range(1,36))
-    miss_back = last_seen(pd.Series(arr_back), range(1,13))
+def _zones(data) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """DataFrame 或 DrawStore -> (期号 int, 前区 (n,5), 后区 (n,2))；DrawStore 直接返回零拷贝视图"""
+    if isinstance(data, pd.DataFrame):
+        return (data["issue"].astype(int).to_numpy(), data[["f1","f2","f3","f4","f5"]].to_numpy(),
+                data[["b1","b2"]].to_numpy())
+    return data.issue, data.front, data.back
+
+def freq_table(data) -> Dict[str, pd.Series]:
+    # data 为 DataFrame 或 DrawStore；只列出出现过的号码
+    _, front, back = _zones(data)
+    def counts(vals:np.ndarray, n:int) -> pd.Series:
+        c = pd.Series(np.bincount(vals.ravel(), minlength=n + 1)[1:], index=range(1, n + 1))
+        return c[c > 0]
+    return {"front": counts(front, 35), "back": counts(back, 12)}
+
+def miss_table(data) -> Dict[str, pd.Series]:
+    # 简单遗漏：从最近一期向前数，距离上次出现的期数（从未出现记为总期数）
+    issue, front, back = _zones(data)
+    order = np.argsort(issue, kind="stable")[::-1]
+    def last_seen(vals:np.ndarray, pool:range) -> pd.Series:
+        n = len(vals)
+        if n == 0:
+            return pd.Series(n, index=list(pool))
+        hits = np.zeros((n, pool.stop), dtype=bool)
+        hits[np.arange(n)[:, None], vals] = True
+        hits = hits[:, pool.start:]
+        miss = np.where(hits.any(axis=0), hits.argmax(axis=0), n)
+        return pd.Series(miss, index=list(pool))
+
+    miss_front = last_seen(front[order], range(1,36))
+    miss_back = last_seen(back[order], range(1,13))
     return {"front": miss_front, "back": miss_back}
+
+def block_hit_matrix(data, cols:Optional[Sequence[str]], bins:Sequence[Tuple[int,int]],
+                     labels:Sequence[str], index=None) -> pd.DataFrame:
+    """
+    每期区块落点矩阵：行=期号，列=区块，落入为 1。
+    data 为 DataFrame 时取 cols 列、以 issue 列为行标签；
+    也可直接传入号码数组（如 store.front），此时行标签取 index。
+    """
+    if isinstance(data, pd.DataFrame):
+        vals, index = data[list(cols)].to_numpy(), data["issue"].to_numpy()
+    else:
+        vals = np.asarray(data)
+    out = np.zeros((len(vals), len(bins)), dtype=np.int8)
+    for i, (lo, hi) in enumerate(bins):
+        out[:, i] = ((vals >= lo) & (vals <= hi)).any(axis=1)
+    return pd.DataFrame(out, index=index, columns=list(labels))
+
+def bucket_matrix(matrix:pd.DataFrame, by:str="issues", size:int=10,
+                  dates:Optional[pd.Series]=None) -> pd.DataFrame:
+    """
+    将逐期落点矩阵聚合为桶内落点比例（0~1）。
+    by="issues"：按相邻 size 期分桶，行标签为 "起始期号~结束期号"
+    by="month"：按开奖月份分桶（需传入与 matrix 行对齐的 dates）
+    """
+    if by == "month":
+        keys = pd.to_datetime(pd.Series(dates).to_numpy()).to_period("M").astype(str)
+        out = matrix.groupby(keys, sort=False).mean()
+    else:
+        size = max(1, int(size))
+        keys = np.arange(len(matrix)) // size
+        out = matrix.groupby(keys, sort=False).mean()
+        issues = matrix.index.to_numpy()
+        first = issues[::size]
+        last = issues[np.minimum(np.arange(len(out)) * size + size - 1, len(issues) - 1)]
+        out.index = [f"{min(a, b)}~{max(a, b)}" for a, b in zip(first, last)]
+    return out.round(2)
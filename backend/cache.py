@@ -0,0 +1,62 @@
+# backend/cache.py
+from __future__ import annotations
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable
+import threading
+
+class ResultCache:
+    """线程安全的 LRU 缓存；同一键并发未命中时只由一个线程计算，其余线程等待其结果"""
+
+    def __init__(self, maxsize:int=256):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending: Dict[Hashable, Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key:Hashable, fn:Callable[[], object]):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            pending = self._pending.get(key)
+            if pending is None:
+                self.misses += 1
+                future = self._pending[key] = Future()
+            else:
+                self.hits += 1
+        if pending is not None:
+            return pending.result()
+        try:
+            value = fn()
+        except BaseException as e:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._pending[key]
+        self.put(key, value)
+        future.set_result(value)
+        return value
+
+    def get(self, key:Hashable, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key:Hashable, value) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,96 @@
+# backend/client.py
+"""
+backend.service 的轻量客户端；设置环境变量 DLT_API_URL 后 app.py 通过它读取数据。
+按 URL 记住 ETag 与响应，服务端返回 304 时直接复用本地副本；
+各页 ETag 均未变化时 dataframe() 直接返回上次构造的 DataFrame。
+应用中应在会话间复用同一实例（如 st.cache_resource），否则 ETag 表每次为空。
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+import requests
+import pandas as pd
+
+from .analysis import dataframe_from_draws
+from .cache import ResultCache
+
+API_URL_ENV = "DLT_API_URL"
+
+class ApiClient:
+    def __init__(self, base_url:Optional[str]=None, timeout:float=30, cache_size:int=64):
+        self.base_url = (base_url or os.environ.get(API_URL_ENV) or "http://127.0.0.1:8765").rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        # 按 URL / 筛选条件记住的响应与 DataFrame，LRU 限量（客户端可能在整个进程内共享）
+        self._etags = ResultCache(maxsize=cache_size)
+        self._frames = ResultCache(maxsize=max(1, cache_size // 8))
+
+    def get(self, path:str, **params) -> Dict:
+        return self._get(path, **params)[1]
+
+    def _get(self, path:str, **params) -> Tuple[Optional[str], Dict]:
+        """返回 (ETag, 响应数据)"""
+        params = {k: v for k, v in params.items() if v not in (None, "", 0)}
+        url = self.base_url + path
+        key = url + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params))
+        cached = self._etags.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        r = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+        if r.status_code == 304 and cached:
+            return cached
+        r.raise_for_status()
+        data = r.json()
+        etag = r.headers.get("ETag")
+        if etag:
+            self._etags.put(key, (etag, data))
+        return etag, data
+
+    def post(self, path:str, payload:Dict) -> Dict:
+        r = self.session.post(self.base_url + path, json=payload, timeout=self.timeout)
+        r.raise_for_status()
+        return r.json()
+
+    def _pages(self, **filters) -> Tuple[tuple, List[dict]]:
+        etags, rows = [], []
+        offset = 0
+        while True:
+            etag, page = self._get("/draws", offset=offset, **filters)
+            etags.append(etag)
+            rows.extend(page["rows"])
+            offset += len(page["rows"])
+            if not page["rows"] or offset >= page["total"]:
+                return tuple(etags), rows
+
+    def draws(self, **filters) -> List[dict]:
+        return self._pages(**filters)[1]
+
+    def dataframe(self, **filters) -> pd.DataFrame:
+        key = repr(sorted(filters.items()))
+        etags, rows = self._pages(**filters)
+        cached = self._frames.get(key)
+        if cached and None not in etags and cached[0] == etags:
+            return cached[1]
+        df = dataframe_from_draws(rows) if rows else pd.DataFrame()
+        self._frames.put(key, (etags, df))
+        return df
+
+    def stats(self, spec:Optional[Dict]=None, **filters) -> Dict:
+        """spec 为 backend.filters 的组合条件，以 JSON 传给服务端"""
+        if spec:
+            filters["spec"] = json.dumps(spec, sort_keys=True, default=str)
+        return self.get("/stats", **filters)
+
+    def freq_miss(self, spec:Optional[Dict]=None, **filters) -> Tuple[Dict[str, pd.Series], Dict[str, pd.Series]]:
+        """与 freq_table / miss_table 同形的结果，由服务端 /stats 计算（共享缓存）"""
+        data = self.stats(spec, **filters)
+        as_series = lambda d: pd.Series({int(k): v for k, v in d.items()}, dtype="int64").sort_index()
+        freq = {zone: as_series(data.get("freq", {}).get(zone, {})) for zone in ("front", "back")}
+        miss = {zone: as_series(data.get("miss", {}).get(zone, {})) for zone in ("front", "back")}
+        return freq, miss
+
+    def generate(self, **payload) -> List[Dict]:
+        return self.post("/generate", payload)["tickets"]
+
+    def score(self, tickets:List[Dict], win_front:List[int], win_back:List[int]) -> List[str]:
+        return self.post("/score", {"tickets": tickets, "win_front": win_front, "win_back": win_back})["prizes"]
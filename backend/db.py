@@ -36,6 +36,16 @@ class Draw(Base):
 def init_db():
     Base.metadata.create_all(engine)
 
+def data_version() -> str:
+    """
+    数据版本标识：只追加写入，最大 id 与最新期号足以反映变化。
+    供各类结果缓存作为键的一部分。
+    """
+    init_db()
+    with engine.connect() as conn:
+        max_id, max_issue = conn.exec_driver_sql("SELECT MAX(id), MAX(issue) FROM draws").one()
+    return f"{max_id or 0}-{max_issue or ''}"
+
 @contextmanager
 def session_scope():
     session = SessionLocal()
@@ -0,0 +1,192 @@
+"""
+流式导出：开奖历史（可带衍生指标）与生成的号码本，写出 CSV / gzip-CSV / Parquet。
+数据按块从 SQLite 游标或批量生成器读出并逐块写盘，内存占用只与块大小有关。
+导出的历史 CSV 列与 import_csv 一致，可直接回灌。
+
+命令行：
+  python -m backend.export draws history.csv.gz --start-issue 24001 --features
+  python -m backend.export draws hot.csv --spec '{"sum_front": [70, 140], "max_omission": [null, 10]}'
+  python -m backend.export tickets book.parquet --count 5000000 --seed 1 --sum-min 70 --sum-max 140
+  python -m backend.export import history.csv.gz
+"""
+from __future__ import annotations
+from typing import BinaryIO, Dict, Iterable, Iterator, Optional, Union
+import gzip
+import io
+import json
+import random
+import pandas as pd
+
+from .db import engine, init_db
+from .analysis import add_features
+from .filters import compile_sql, filter_store
+from .store import DrawStore
+from .generator import gen_numbers
+
+DRAW_COLUMNS = ["issue", "date", "f1", "f2", "f3", "f4", "f5", "b1", "b2", "sales", "pool"]
+TICKET_COLUMNS = ["f1", "f2", "f3", "f4", "f5", "b1", "b2"]
+FORMATS = ("csv", "csv.gz", "parquet")
+
+def infer_format(path:str) -> str:
+    p = path.lower()
+    if p.endswith(".csv.gz") or p.endswith(".gz"):
+        return "csv.gz"
+    if p.endswith(".parquet") or p.endswith(".pq"):
+        return "parquet"
+    return "csv"
+
+def iter_draw_chunks(chunk_size:int=50_000, features:bool=False, spec:Optional[Dict]=None,
+                     **filters) -> Iterator[pd.DataFrame]:
+    """
+    按期号倒序从 SQLite 分块读取开奖。筛选条件见 backend.filters（filters 为其中的关键字形式）；
+    可下推的条件编译为 SQL，其余（如遗漏）在整段历史上算出掩码后逐块过滤。
+    无匹配时产出一个空块，保证写出的文件带表头/表结构。
+    """
+    init_db()
+    spec = {**filters, **(spec or {})}
+    where, params, residual = compile_sql(spec)
+    recent_n = int(residual.pop("recent_n", 0) or 0)
+    keep = None
+    if residual:
+        selected = filter_store(DrawStore.load(), spec)
+        keep = set(selected.issue_str)
+        recent_n = 0
+    sql = f"SELECT {', '.join(DRAW_COLUMNS)} FROM draws{where} ORDER BY issue DESC"
+    if recent_n > 0:
+        sql += f" LIMIT {recent_n}"
+    conn = engine.raw_connection()
+    empty = True
+    try:
+        cur = conn.cursor()
+        cur.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            chunk = pd.DataFrame.from_records(rows, columns=DRAW_COLUMNS)
+            if keep is not None:
+                chunk = chunk[chunk["issue"].isin(keep)].reset_index(drop=True)
+                if chunk.empty:
+                    continue
+            empty = False
+            yield add_features(chunk) if features else chunk
+    finally:
+        conn.close()
+    if empty:
+        chunk = pd.DataFrame({c: pd.Series(dtype="int64" if c in TICKET_COLUMNS else "string") for c in DRAW_COLUMNS})
+        yield add_features(chunk) if features else chunk
+
+def iter_ticket_chunks(count:int, chunk_size:int=100_000, seed:Optional[int]=None,
+                       **gen_kwargs) -> Iterator[pd.DataFrame]:
+    """分批调用 gen_numbers 生成号码本；规则过严导致某批生成为空时提前结束（一注都没有时产出空块）"""
+    rng = random.Random(seed)
+    left = count
+    while left > 0:
+        tickets = gen_numbers(count=min(chunk_size, left), rng=rng, **gen_kwargs)
+        if not tickets:
+            break
+        left -= len(tickets)
+        yield pd.DataFrame([t["front"] + t["back"] for t in tickets], columns=TICKET_COLUMNS)
+    if left == count:
+        yield pd.DataFrame({c: pd.Series(dtype="int64") for c in TICKET_COLUMNS})
+
+def write_chunks(chunks:Iterable[pd.DataFrame], dest:Union[str, BinaryIO], fmt:Optional[str]=None) -> int:
+    """将数据块逐块写到路径或二进制文件对象，返回写出行数"""
+    fmt = fmt or (infer_format(dest) if isinstance(dest, str) else "csv")
+    if fmt not in FORMATS:
+        raise ValueError(f"不支持的导出格式: {fmt}")
+    if fmt == "parquet":
+        return _write_parquet(chunks, dest)
+
+    own = isinstance(dest, str)
+    raw = open(dest, "wb") if own else dest
+    gz = gzip.GzipFile(fileobj=raw, mode="wb") if fmt == "csv.gz" else None
+    text = io.TextIOWrapper(gz or raw, encoding="utf-8", newline="")
+    total = 0
+    try:
+        for chunk in chunks:
+            chunk.to_csv(text, index=False, header=(total == 0))
+            total += len(chunk)
+        text.flush()
+    finally:
+        text.detach()
+        if gz is not None:
+            gz.close()
+        if own:
+            raw.close()
+    return total
+
+def _write_parquet(chunks:Iterable[pd.DataFrame], dest:Union[str, BinaryIO]) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("导出 Parquet 需要安装 pyarrow：pip install pyarrow") from e
+    writer = None
+    total = 0
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(dest, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            total += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return total
+
+def export_draws(dest:Union[str, BinaryIO], fmt:Optional[str]=None, features:bool=False,
+                 chunk_size:int=50_000, spec:Optional[Dict]=None, **filters) -> int:
+    return write_chunks(iter_draw_chunks(chunk_size=chunk_size, features=features, spec=spec, **filters), dest, fmt)
+
+def export_tickets(dest:Union[str, BinaryIO], count:int, fmt:Optional[str]=None,
+                   chunk_size:int=100_000, seed:Optional[int]=None, **gen_kwargs) -> int:
+    return write_chunks(iter_ticket_chunks(count, chunk_size=chunk_size, seed=seed, **gen_kwargs), dest, fmt)
+
+if __name__ == "__main__":
+    import argparse
+    from .sync import import_csv
+
+    ap = argparse.ArgumentParser(description="导出开奖历史/号码本，或回灌导出的历史 CSV")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    d = sub.add_parser("draws", help="导出开奖历史")
+    d.add_argument("path")
+    d.add_argument("--format", choices=FORMATS)
+    d.add_argument("--features", action="store_true", help="附带和值/奇偶等衍生指标")
+    d.add_argument("--start-issue", default="")
+    d.add_argument("--end-issue", default="")
+    d.add_argument("--start-date")
+    d.add_argument("--end-date")
+    d.add_argument("--recent-n", type=int, default=0)
+    d.add_argument("--spec", help='组合筛选条件 JSON，如 \'{"sum_front":[70,140],"max_omission":[null,10]}\'')
+
+    t = sub.add_parser("tickets", help="按规则生成并导出号码本")
+    t.add_argument("path")
+    t.add_argument("--format", choices=FORMATS)
+    t.add_argument("--count", type=int, required=True)
+    t.add_argument("--seed", type=int)
+    t.add_argument("--sum-min", type=int)
+    t.add_argument("--sum-max", type=int)
+    t.add_argument("--odd", type=int, help="前区奇数个数")
+
+    i = sub.add_parser("import", help="将导出的历史 CSV（可为 .gz）导入数据库")
+    i.add_argument("path")
+
+    a = ap.parse_args()
+    if a.cmd == "draws":
+        n = export_draws(a.path, a.format, features=a.features, start_issue=a.start_issue, end_issue=a.end_issue,
+                         start_date=a.start_date, end_date=a.end_date, recent_n=a.recent_n,
+                         spec=json.loads(a.spec) if a.spec else None)
+        print(f"已导出 {n} 期开奖到 {a.path}")
+    elif a.cmd == "tickets":
+        rules: Dict = {}
+        if a.sum_min is not None or a.sum_max is not None:
+            rules["sum_front_range"] = [a.sum_min, a.sum_max]
+        if a.odd is not None:
+            rules["odd_even_front"] = [a.odd, 5 - a.odd]
+        n = export_tickets(a.path, a.count, a.format, seed=a.seed, rules=rules)
+        print(f"已导出 {n} 注号码到 {a.path}")
+    else:
+        print(f"导入 {import_csv(a.path)} 条数据")
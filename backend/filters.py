@@ -0,0 +1,225 @@
+# backend/filters.py
+"""
+多条件组合筛选：把声明式条件编译为一个向量化布尔掩码，能下推的部分可编译为 SQL WHERE。
+
+条件示例（未给出的键不筛选；区间为 [最小, 最大]，任一端可为 None，单个整数表示等于）：
+{
+    "start_issue": "24001", "end_issue": "25100",
+    "start_date": "2024-01-01", "end_date": "2025-09-01",
+    "recent_n": 100,                 # 满足其余条件的最近 N 期
+    "sum_front": [70, 140],          # 前区和值
+    "front_odd": [2, 3],             # 前区奇数个数
+    "span": [15, None],              # 前区跨度（最大-最小）
+    "consecutive": [1, None],        # 前区连号对数
+    "front_include": [7], "front_exclude": [13],
+    "back_include": [], "back_exclude": [],
+    "blocks": {"1-5": [1, None], "31-35": 0},   # 前区各区块落点个数
+    "max_omission": [None, 10],      # 本期前区号码开出前的最大遗漏期数
+}
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Sequence, Tuple
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+
+from .cache import ResultCache
+
+RANGE_KEYS = ("sum_front", "front_odd", "span", "consecutive", "max_omission")
+SQL_KEYS = ("start_issue", "end_issue", "start_date", "end_date", "sum_front", "front_odd", "span",
+            "front_include", "front_exclude", "back_include", "back_exclude", "blocks")
+
+_features = ResultCache(maxsize=8)
+_masks = ResultCache(maxsize=128)
+
+class DrawArrays:
+    """筛选所需的列：期号、日期天数、前区 (n,5)、后区 (n,2)；行序与来源一致"""
+    __slots__ = ("issue", "date", "front", "back", "fingerprint")
+
+    def __init__(self, issue:np.ndarray, date:np.ndarray, front:np.ndarray, back:np.ndarray):
+        self.issue, self.date, self.front, self.back = issue, date, front, back
+        h = hashlib.sha1()
+        for a in (issue, date, front, back):
+            h.update(np.ascontiguousarray(a).tobytes())
+        self.fingerprint = h.hexdigest()
+
+    @classmethod
+    def from_store(cls, store) -> "DrawArrays":
+        return cls(store.issue, store.date, store.front, store.back)
+
+    @classmethod
+    def from_frame(cls, df:pd.DataFrame) -> "DrawArrays":
+        return cls(df["issue"].astype(int).to_numpy(np.int32),
+                   df["date"].to_numpy("datetime64[D]").astype(np.int32),
+                   df[["f1","f2","f3","f4","f5"]].to_numpy(np.int8),
+                   df[["b1","b2"]].to_numpy(np.int8))
+
+    def __len__(self) -> int:
+        return len(self.issue)
+
+def spec_hash(spec:Dict) -> str:
+    canon = {k: v for k, v in spec.items() if v is not None and v != "" and v != [] and v != {}}
+    return hashlib.sha1(json.dumps(canon, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def _range(v) -> Tuple[Optional[float], Optional[float]]:
+    if isinstance(v, (list, tuple)):
+        lo, hi = (list(v) + [None, None])[:2]
+        return lo, hi
+    return v, v
+
+def _block_range(label:str) -> Tuple[int, int]:
+    lo, hi = label.split("-")
+    return int(lo), int(hi)
+
+def _mask_of(nums:Sequence[int]) -> int:
+    m = 0
+    for n in nums:
+        m |= 1 << int(n)
+    return m
+
+def _day(d) -> int:
+    return int(np.datetime64(pd.Timestamp(d).date(), "D").astype(np.int64))
+
+def _features_of(arr:DrawArrays) -> Dict[str, np.ndarray]:
+    """按数据指纹缓存的逐期衍生特征"""
+    def compute():
+        front = np.sort(arr.front.astype(np.int16), axis=1)
+        n = len(arr)
+        bits = (np.int64(1) << front.astype(np.int64)).sum(axis=1)
+        bbits = (np.int64(1) << arr.back.astype(np.int64)).sum(axis=1)
+        # 遗漏需按时间顺序计算，再映射回原行序
+        order = np.argsort(arr.issue, kind="stable")
+        hits = np.zeros((n, 36), dtype=bool)
+        hits[np.arange(n)[:, None], front[order]] = True
+        t = np.arange(n, dtype=np.int32)[:, None]
+        last = np.maximum.accumulate(np.where(hits, t, -1), axis=0)
+        prev = np.vstack([np.full((1, 36), -1, dtype=last.dtype), last[:-1]])
+        omission = np.where(hits, t - prev - 1, -1).max(axis=1)
+        max_omission = np.empty(n, dtype=np.int32)
+        max_omission[order] = omission
+        return {
+            "front": front,
+            "sum_front": front.sum(axis=1),
+            "front_odd": (front % 2).sum(axis=1),
+            "span": front[:, -1] - front[:, 0],
+            "consecutive": (np.diff(front, axis=1) == 1).sum(axis=1),
+            "front_bits": bits,
+            "back_bits": bbits,
+            "max_omission": max_omission,
+        }
+    return _features.get_or_compute(arr.fingerprint, compute)
+
+def compile_mask(arr:DrawArrays, spec:Dict) -> np.ndarray:
+    """把条件编译为布尔掩码（与 arr 行序一致），按 (数据指纹, 条件哈希) 缓存"""
+    return _masks.get_or_compute((arr.fingerprint, spec_hash(spec)), lambda: _compile(arr, spec))
+
+def _compile(arr:DrawArrays, spec:Dict) -> np.ndarray:
+    mask = np.ones(len(arr), dtype=bool)
+    feats = None
+
+    def narrow(cond):
+        np.logical_and(mask, cond, out=mask)
+
+    def between(values, v):
+        lo, hi = _range(v)
+        if lo is not None:
+            narrow(values >= lo)
+        if hi is not None:
+            narrow(values <= hi)
+
+    if spec.get("start_issue"):
+        narrow(arr.issue >= int(spec["start_issue"]))
+    if spec.get("end_issue"):
+        narrow(arr.issue <= int(spec["end_issue"]))
+    if spec.get("start_date"):
+        narrow(arr.date >= _day(spec["start_date"]))
+    if spec.get("end_date"):
+        narrow(arr.date <= _day(spec["end_date"]))
+
+    derived = [k for k in RANGE_KEYS if spec.get(k) is not None] + \
+              [k for k in ("front_include", "front_exclude", "back_include", "back_exclude", "blocks") if spec.get(k)]
+    if derived:
+        feats = _features_of(arr)
+    for k in RANGE_KEYS:
+        if spec.get(k) is not None:
+            between(feats[k], spec[k])
+    if spec.get("front_include"):
+        m = _mask_of(spec["front_include"])
+        narrow(feats["front_bits"] & m == m)
+    if spec.get("front_exclude"):
+        narrow(feats["front_bits"] & _mask_of(spec["front_exclude"]) == 0)
+    if spec.get("back_include"):
+        m = _mask_of(spec["back_include"])
+        narrow(feats["back_bits"] & m == m)
+    if spec.get("back_exclude"):
+        narrow(feats["back_bits"] & _mask_of(spec["back_exclude"]) == 0)
+    for label, v in (spec.get("blocks") or {}).items():
+        lo, hi = _block_range(label)
+        between(((feats["front"] >= lo) & (feats["front"] <= hi)).sum(axis=1), v)
+
+    recent_n = int(spec.get("recent_n") or 0)
+    if recent_n > 0:
+        idx = np.flatnonzero(mask)
+        if len(idx) > recent_n:
+            keep = idx[np.argsort(-arr.issue[idx], kind="stable")[:recent_n]]
+            mask[:] = False
+            mask[keep] = True
+    return mask
+
+def filter_frame(df:pd.DataFrame, spec:Dict) -> pd.DataFrame:
+    """按条件筛选 dataframe_from_draws 风格的 DataFrame，只在最后按掩码取一次行"""
+    if df.empty or not spec_has_conditions(spec):
+        return df
+    return df[compile_mask(DrawArrays.from_frame(df), spec)]
+
+def filter_store(store, spec:Dict):
+    return store.take(compile_mask(DrawArrays.from_store(store), spec))
+
+def spec_has_conditions(spec:Dict) -> bool:
+    return any(v is not None and v != "" and v != [] and v != {} and not (k == "recent_n" and not v)
+               for k, v in spec.items())
+
+def compile_sql(spec:Dict) -> Tuple[str, List, Dict]:
+    """
+    将可下推的条件编译为 SQL（连号、遗漏、最近 N 期留作剩余条件）。
+    返回 (WHERE 子句, 参数, 需在内存中继续筛选的剩余条件)。
+    """
+    conds: List[str] = []
+    params: List = []
+    front = "f1, f2, f3, f4, f5"
+
+    def between(expr:str, v):
+        lo, hi = _range(v)
+        if lo is not None:
+            conds.append(f"{expr} >= ?"); params.append(lo)
+        if hi is not None:
+            conds.append(f"{expr} <= ?"); params.append(hi)
+
+    if spec.get("start_issue"):
+        conds.append("issue >= ?"); params.append(str(spec["start_issue"]))
+    if spec.get("end_issue"):
+        conds.append("issue <= ?"); params.append(str(spec["end_issue"]))
+    if spec.get("start_date"):
+        conds.append("date >= ?"); params.append(str(pd.Timestamp(spec["start_date"]).date()))
+    if spec.get("end_date"):
+        conds.append("date <= ?"); params.append(str(pd.Timestamp(spec["end_date"]).date()))
+    if spec.get("sum_front") is not None:
+        between("(f1 + f2 + f3 + f4 + f5)", spec["sum_front"])
+    if spec.get("front_odd") is not None:
+        between("(f1 % 2 + f2 % 2 + f3 % 2 + f4 % 2 + f5 % 2)", spec["front_odd"])
+    if spec.get("span") is not None:
+        between(f"(MAX({front}) - MIN({front}))", spec["span"])
+    for key, cols in (("front", front), ("back", "b1, b2")):
+        for n in spec.get(f"{key}_include") or []:
+            conds.append(f"? IN ({cols})"); params.append(int(n))
+        for n in spec.get(f"{key}_exclude") or []:
+            conds.append(f"? NOT IN ({cols})"); params.append(int(n))
+    for label, v in (spec.get("blocks") or {}).items():
+        lo, hi = _block_range(label)
+        between("(" + " + ".join(f"({c} BETWEEN {lo} AND {hi})" for c in ("f1", "f2", "f3", "f4", "f5")) + ")", v)
+
+    residual = {k: v for k, v in spec.items()
+                if k not in SQL_KEYS and v is not None and v != "" and v != [] and v != {}}
+    where = (" WHERE " + " AND ".join(conds)) if conds else ""
+    return where, params, residual
@@ -1,7 +1,53 @@
 # backend/generator.py
 from __future__ import annotations
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Sequence
 import random
+import numpy as np
+
+def number_weights(freq:Dict[int,float], miss:Dict[int,float], mode:str="hot",
+                   temperature:float=1.0) -> Dict[int,float]:
+    """
+    由 freq_table / miss_table 的结果得到逐号码权重（归一化）。
+    mode: "hot" 出现次数多者优先；"cold" 遗漏期数大者优先；"mixed" 两者几何平均。
+    temperature 越大越接近均匀，越小越偏向极端号码。
+    """
+    nums = sorted(set(freq.keys()) | set(miss.keys()))
+    hot = np.array([float(freq.get(n, 0)) + 1.0 for n in nums])
+    cold = np.array([float(miss.get(n, 0)) + 1.0 for n in nums])
+    if mode == "hot":
+        score = hot / hot.mean()
+    elif mode == "cold":
+        score = cold / cold.mean()
+    elif mode == "mixed":
+        score = np.sqrt(hot / hot.mean() * cold / cold.mean())
+    else:
+        raise ValueError(f"未知权重模式: {mode}")
+    w = score ** (1.0 / max(float(temperature), 1e-3))
+    w = w / w.sum()
+    return {n: float(x) for n, x in zip(nums, w)}
+
+class WeightedSampler:
+    """
+    逐号码加权的不放回抽样。倒数权重表在构造时一次算好，
+    抽样用指数竞争（Efraimidis-Spirakis）：每行 key=Exp(1)/w，取最小的 k 个，整批向量化完成。
+    """
+    __slots__ = ("numbers", "inv_w")
+
+    def __init__(self, pool:Sequence[int], weights:Dict[int,float]):
+        self.numbers = np.array(sorted(pool), dtype=np.int64)
+        w = np.array([float(weights.get(int(n), 0.0)) for n in self.numbers])
+        with np.errstate(divide="ignore"):
+            self.inv_w = np.where(w > 0, 1.0 / np.where(w > 0, w, 1.0), np.inf)
+
+    def sample(self, rng:np.random.Generator, size:int, k:int) -> np.ndarray:
+        """返回 (size, k) 的号码矩阵，每行升序"""
+        keys = rng.standard_exponential((size, self.numbers.size)) * self.inv_w
+        idx = np.argpartition(keys, k - 1, axis=1)[:, :k]
+        return np.sort(self.numbers[idx], axis=1)
+
+    def iter_rows(self, rng:np.random.Generator, k:int, batch:int=2048) -> Iterator[List[int]]:
+        while True:
+            yield from self.sample(rng, batch, k).tolist()
 
 def gen_numbers(
     count: int = 5,
@@ -13,8 +59,14 @@ def gen_numbers(
     back_blocks: Optional[Dict[str,List[int]]] = None,
     front_weights: Optional[Dict[str,float]] = None,
     back_weights: Optional[Dict[str,float]] = None,
-    use_block_weight: bool = False
+    use_block_weight: bool = False,
+    front_num_weights: Optional[Dict[int,float]] = None,
+    back_num_weights: Optional[Dict[int,float]] = None,
 ) -> List[Dict]:
+    """
+    front_num_weights / back_num_weights：逐号码权重（见 number_weights），给定时优先于区块权重，
+    候选号码由 WeightedSampler 按批生成。
+    """
     rng = rng or random.Random()
     rules = rules or {}
 
@@ -25,8 +77,9 @@ def gen_numbers(
                 cnt += 1
         return cnt
 
-    def choose_from_weighted_blocks(blocks: Dict[str, List[int]], weights: Dict[str, float], num_needed: int,
-                                    exclude_nums: set = None) -> List[int]:
+    def make_block_chooser(blocks: Dict[str, List[int]], weights: Dict[str, float],
+                           exclude_nums: set = None):
+        # 有效区块与归一化权重只计算一次，返回的函数在每次尝试时只做抽样
         exclude_nums = exclude_nums or set()
         # 过滤每个区块里的排除数字
         valid_blocks = {b: [n for n in nums if n not in exclude_nums] for b, nums in blocks.items() if
@@ -37,24 +90,27 @@ def gen_numbers(
 
         total_w = sum(weights.get(b, 1.0) for b in valid_blocks)
         norm_weights = {b: weights.get(b, 1.0) / total_w for b in valid_blocks}
-
-        counts = {b: int(norm_weights[b] * num_needed) for b in valid_blocks}
-        total_selected = sum(counts.values())
-        remaining = num_needed - total_selected
-
         block_names = list(valid_blocks.keys())
-        probs = [norm_weights[b] for b in block_names]
-        for _ in range(remaining):
-            chosen_block = random.choices(block_names, probs, k=1)[0]
-            counts[chosen_block] += 1
-
-        result = []
-        for b, c in counts.items():
-            nums = valid_blocks[b].copy()
-            random.shuffle(nums)
-            result.extend(nums[:c])
-        random.shuffle(result)
-        return sorted(result[:num_needed])
+        cum_weights = []
+        acc = 0.0
+        for b in block_names:
+            acc += norm_weights[b]
+            cum_weights.append(acc)
+
+        def choose(num_needed: int) -> List[int]:
+            counts = {b: int(norm_weights[b] * num_needed) for b in valid_blocks}
+            remaining = num_needed - sum(counts.values())
+            for chosen_block in rng.choices(block_names, cum_weights=cum_weights, k=remaining):
+                counts[chosen_block] += 1
+
+            result = []
+            for b, c in counts.items():
+                if c:
+                    nums = valid_blocks[b]
+                    result.extend(rng.sample(nums, min(c, len(nums))))
+            rng.shuffle(result)
+            return sorted(result[:num_needed])
+        return choose
 
     results: List[Dict] = []
     tries = 0
@@ -69,27 +125,40 @@ def gen_numbers(
     cons_req = rules.get("consecutive_count",None)
     cons_mode = rules.get("consecutive_mode","exact")
 
-    while len(results)<count and tries<max_tries:
-        tries += 1
-        front_pool = front_pool_user if front_pool_user is not None else [n for n in range(1,36)]
-        back_pool = back_pool_user if back_pool_user is not None else [n for n in range(1,13)]
+    front_pool = front_pool_user if front_pool_user is not None else [n for n in range(1,36)]
+    back_pool = back_pool_user if back_pool_user is not None else [n for n in range(1,13)]
 
-        front_pool = [n for n in front_pool if n not in front_exclude]
-        back_pool = [n for n in back_pool if n not in back_exclude]
+    front_pool = [n for n in front_pool if n not in front_exclude]
+    back_pool = [n for n in back_pool if n not in back_exclude]
 
-        if len(front_pool)<5 or len(back_pool)<2:
-            break
+    if len(front_pool)<5 or len(back_pool)<2:
+        return results
 
-        if use_block_weight and front_blocks and front_weights:
-            f = choose_from_weighted_blocks(front_blocks, front_weights, 5, exclude_nums=front_exclude)
+    np_rng = np.random.default_rng(rng.getrandbits(64)) if (front_num_weights or back_num_weights) else None
+    batch = min(2048, max(64, count*4))
 
-        else:
-            f = sorted(rng.sample(front_pool,5))
+    if front_num_weights:
+        front_rows = WeightedSampler(front_pool, front_num_weights).iter_rows(np_rng, 5, batch)
+        pick_front = lambda: next(front_rows)
+    elif use_block_weight and front_blocks and front_weights:
+        choose_front = make_block_chooser(front_blocks, front_weights, exclude_nums=front_exclude)
+        pick_front = lambda: choose_front(5)
+    else:
+        pick_front = lambda: sorted(rng.sample(front_pool,5))
 
-        if use_block_weight and back_blocks and back_weights:
-            b = choose_from_weighted_blocks(back_blocks, back_weights, 2, exclude_nums=back_exclude)
-        else:
-            b = sorted(rng.sample(back_pool,2))
+    if back_num_weights:
+        back_rows = WeightedSampler(back_pool, back_num_weights).iter_rows(np_rng, 2, batch)
+        pick_back = lambda: next(back_rows)
+    elif use_block_weight and back_blocks and back_weights:
+        choose_back = make_block_chooser(back_blocks, back_weights, exclude_nums=back_exclude)
+        pick_back = lambda: choose_back(2)
+    else:
+        pick_back = lambda: sorted(rng.sample(back_pool,2))
+
+    while len(results)<count and tries<max_tries:
+        tries += 1
+        f = pick_front()
+        b = pick_back()
 
         ok = True
         if front_include and not front_include.issubset(set(f)):
@@ -0,0 +1,69 @@
+"""
+backend.service 压测脚本。
+
+python -m backend.loadtest --url http://127.0.0.1:8765 --concurrency 16 --requests 2000 [--etag]
+"""
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+from typing import List, Tuple
+import argparse
+import random
+import threading
+import time
+import requests
+
+SCENARIOS = [
+    ("GET", "/draws", {"recent_n": 100}),
+    ("GET", "/draws", {}),
+    ("GET", "/stats", {}),
+    ("GET", "/stats", {"recent_n": 50}),
+    ("POST", "/generate", {"count": 10, "seed": 1, "rules": {"sum_front_range": [70, 140]}}),
+    ("POST", "/score", {"tickets": [{"front": [1, 2, 3, 4, 5], "back": [1, 2]}] * 20,
+                        "win_front": [1, 2, 3, 10, 20], "win_back": [1, 5]}),
+]
+
+_local = threading.local()
+
+def _session() -> requests.Session:
+    if not hasattr(_local, "s"):
+        _local.s = requests.Session()
+        _local.etags = {}
+    return _local.s
+
+def _one(base:str, use_etag:bool, rnd:random.Random) -> Tuple[int, float]:
+    method, path, payload = rnd.choice(SCENARIOS)
+    s = _session()
+    t0 = time.perf_counter()
+    if method == "GET":
+        key = (path, tuple(sorted(payload.items())))
+        headers = {"If-None-Match": _local.etags[key]} if use_etag and key in _local.etags else {}
+        r = s.get(base + path, params=payload, headers=headers, timeout=60)
+        if r.headers.get("ETag"):
+            _local.etags[key] = r.headers["ETag"]
+    else:
+        r = s.post(base + path, json=payload, timeout=60)
+    return r.status_code, time.perf_counter() - t0
+
+def run(url:str, concurrency:int, n:int, use_etag:bool, seed:int=0) -> None:
+    base = url.rstrip("/")
+    rnd = random.Random(seed)
+    plan = [random.Random(rnd.getrandbits(32)) for _ in range(n)]
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        results: List[Tuple[int, float]] = list(ex.map(lambda r: _one(base, use_etag, r), plan))
+    wall = time.perf_counter() - t0
+    lat = sorted(x[1] for x in results)
+    pct = lambda q: lat[min(len(lat) - 1, int(q * len(lat)))] * 1000
+    print(f"{n} 个请求，并发 {concurrency}，耗时 {wall:.2f}s，吞吐 {n / wall:.1f} req/s")
+    print(f"延迟 ms：p50 {pct(0.5):.1f}  p95 {pct(0.95):.1f}  p99 {pct(0.99):.1f}  max {lat[-1] * 1000:.1f}")
+    print("状态码：", dict(Counter(x[0] for x in results)))
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="dlt-api 压测")
+    ap.add_argument("--url", default="http://127.0.0.1:8765")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--etag", action="store_true", help="重复 GET 携带 If-None-Match")
+    a = ap.parse_args()
+    run(a.url, a.concurrency, a.requests, a.etag)
@@ -0,0 +1,84 @@
+# backend/prize.py
+from __future__ import annotations
+from typing import Dict, List, Sequence
+
+TICKET_PRICE = 2  # 单注 2 元
+
+# 奖级顺序即奖级编号，最后一项为未中奖
+PRIZE_LEVELS: List[str] = [
+    "一等奖 1000W",
+    "二等奖 500W",
+    "三等奖 1W",
+    "四等奖 3K",
+    "五等奖 300",
+    "六等奖 200",
+    "七等奖 100",
+    "八等奖",
+    "九等奖",
+    "未中奖",
+]
+
+# 浮动奖级：奖金随销量与奖池变化，标签中的 1000W/500W 仅为显示用
+FLOATING_LEVELS = ("一等奖 1000W", "二等奖 500W")
+
+# 单注奖金（元）；浮动奖按近年基本投注单注奖金的大致量级取参考值，模拟时可覆盖
+PRIZE_AMOUNTS: Dict[str, int] = {
+    "一等奖 1000W": 7_000_000,
+    "二等奖 500W": 150_000,
+    "三等奖 1W": 10_000,
+    "四等奖 3K": 3_000,
+    "五等奖 300": 300,
+    "六等奖 200": 200,
+    "七等奖 100": 100,
+    "八等奖": 15,
+    "九等奖": 5,
+    "未中奖": 0,
+}
+
+def resolve_level(name:str) -> str:
+    """奖级全名或前缀（如 "二等奖"）-> PRIZE_LEVELS 中的全名"""
+    if name in PRIZE_LEVELS:
+        return name
+    matches = [p for p in PRIZE_LEVELS if p.split(" ")[0] == name]
+    if len(matches) != 1:
+        raise ValueError(f"未知奖级: {name}")
+    return matches[0]
+
+def check_prize(gen_front:Sequence[int], gen_back:Sequence[int],
+                win_front:Sequence[int], win_back:Sequence[int]) -> str:
+    fc = len(set(gen_front) & set(win_front))
+    bc = len(set(gen_back) & set(win_back))
+    return prize_by_hits(fc, bc)
+
+def prize_by_hits(fc:int, bc:int) -> str:
+    if fc == 5 and bc == 2:
+        return "一等奖 1000W"
+    elif fc == 5 and bc == 1:
+        return "二等奖 500W"
+    elif fc == 5:
+        return "三等奖 1W"
+    elif fc == 4 and bc == 2:
+        return "四等奖 3K"
+    elif fc == 4 and bc == 1:
+        return "五等奖 300"
+    elif fc == 3 and bc == 2:
+        return "六等奖 200"
+    elif fc == 4:
+        return "七等奖 100"
+    elif fc == 3 and bc == 1:
+        return "八等奖"
+    elif fc == 2 and bc == 2:
+        return "八等奖"
+    elif fc == 1 and bc == 2:
+        return "九等奖"
+    elif bc == 2:
+        return "九等奖"
+    else:
+        return "未中奖"
+
+def prize_table() -> List[List[int]]:
+    """
+    返回 6×3 的奖级编号表：table[前区命中数][后区命中数] -> PRIZE_LEVELS 下标。
+    供向量化计分直接查表使用。
+    """
+    return [[PRIZE_LEVELS.index(prize_by_hits(fc, bc)) for bc in range(3)] for fc in range(6)]
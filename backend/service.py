@@ -0,0 +1,239 @@
+"""
+本地 HTTP API 服务：多个 Streamlit 会话/脚本共用一份进程内结果缓存。
+
+启动：python -m backend.service --port 8765 --workers 8
+
+接口（均返回 JSON）：
+  GET  /version                      当前数据版本
+  GET  /draws?start_issue=&end_issue=&start_date=&end_date=&recent_n=&limit=&offset=
+  GET  /stats?（同 /draws 的筛选参数）  频次、遗漏、和值/奇偶统计
+  /draws 与 /stats 另可带 spec=<JSON>，即 backend.filters 的组合条件
+  POST /generate  {"count":5（≤10000）,"rules":{...},"front_pool":[...],"back_pool":[...],
+                   "hot_cold":{"mode":"hot","temperature":1.0},"seed":1}
+  POST /score     {"tickets":[{"front":[...],"back":[...]}],"win_front":[...],"win_back":[...]}
+
+缓存键包含数据版本，库中新增开奖后旧结果自然失效并按 LRU 淘汰；
+GET 响应带 ETag，客户端携带 If-None-Match 命中时返回 304。
+"""
+from __future__ import annotations
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit, parse_qsl
+import hashlib
+import json
+import random
+import threading
+import numpy as np
+
+from .cache import ResultCache
+from .db import data_version
+from .store import DrawStore
+from .analysis import dataframe_from_store, freq_table, miss_table
+from .filters import filter_frame, filter_store, spec_hash
+from .generator import gen_numbers, number_weights
+from .prize import check_prize
+
+FILTER_KEYS = ("start_issue", "end_issue", "start_date", "end_date", "recent_n")
+MAX_PAGE = 5000  # /draws 单页上限
+MAX_GENERATE = 10_000  # /generate 单次注数上限，大批量号码本请用 backend.export
+
+cache = ResultCache()
+
+def _etag(version:str, path:str, params:Tuple) -> str:
+    return '"' + hashlib.sha1(repr((version, path, params)).encode("utf-8")).hexdigest()[:20] + '"'
+
+def _dump(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _store(version:str) -> DrawStore:
+    return cache.get_or_compute(("store", version), DrawStore.load)
+
+def _frame(version:str):
+    return cache.get_or_compute(("frame", version), lambda: dataframe_from_store(_store(version)))
+
+def _filter_spec(params:Dict[str, str]) -> Dict:
+    # 简单筛选参数之外，spec 参数可携带 backend.filters 的完整条件 JSON
+    spec = json.loads(params["spec"]) if params.get("spec") else {}
+    if not isinstance(spec, dict):
+        raise ValueError("spec 须为 JSON 对象")
+    spec.update({k: params[k] for k in FILTER_KEYS if params.get(k)})
+    if "recent_n" in spec:
+        spec["recent_n"] = int(spec["recent_n"])
+    return spec
+
+def _filtered(version:str, params:Dict[str, str]):
+    spec = _filter_spec(params)
+    key = ("filtered", version, spec_hash(spec))
+    return cache.get_or_compute(key, lambda: filter_frame(_frame(version), spec))
+
+def _filtered_store(version:str, params:Dict[str, str]) -> DrawStore:
+    # 统计类接口直接在紧凑数组上计算，不经过 DataFrame
+    spec = _filter_spec(params)
+    key = ("filtered_store", version, spec_hash(spec))
+    return cache.get_or_compute(key, lambda: filter_store(_store(version), spec))
+
+def draws_payload(version:str, params:Dict[str, str]) -> bytes:
+    df = _filtered(version, params)
+    offset = int(params.get("offset", 0))
+    limit = min(int(params.get("limit", MAX_PAGE)), MAX_PAGE)
+    page = df.iloc[offset:offset + limit]
+    cols = ["issue", "date", "f1", "f2", "f3", "f4", "f5", "b1", "b2", "sales", "pool"]
+    page = page[[c for c in cols if c in page.columns]].assign(date=page["date"].dt.strftime("%Y-%m-%d"))
+    return _dump({"version": version, "total": len(df), "offset": offset,
+                  "rows": page.to_dict("records")})
+
+def stats_payload(version:str, params:Dict[str, str]) -> bytes:
+    store = _filtered_store(version, params)
+    if len(store) == 0:
+        return _dump({"version": version, "count": 0})
+    freq, miss = freq_table(store), miss_table(store)
+    as_dict = lambda s: {int(k): int(v) for k, v in s.items()}
+    sum_front = store.front.sum(axis=1, dtype=np.int64)
+    odd_count = (store.front % 2).sum(axis=1) + (store.back % 2).sum(axis=1)
+    return _dump({
+        "version": version,
+        "count": len(store),
+        "freq": {"front": as_dict(freq["front"]), "back": as_dict(freq["back"])},
+        "miss": {"front": as_dict(miss["front"]), "back": as_dict(miss["back"])},
+        "sum_front": {"mean": float(sum_front.mean()), "std": float(sum_front.std()),
+                      "min": int(sum_front.min()), "max": int(sum_front.max())},
+        "odd_count": {int(k): int(v) for k, v in zip(*np.unique(odd_count, return_counts=True))},
+    })
+
+def _object(value, name:str) -> Dict:
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        raise ValueError(f"{name} 须为 JSON 对象")
+    return value
+
+def generate_payload(version:str, body:Dict) -> bytes:
+    kwargs = {}
+    count = int(body.get("count", 5))
+    if not 0 < count <= MAX_GENERATE:
+        raise ValueError(f"count 须在 1~{MAX_GENERATE} 之间")
+    hot_cold = _object(body.get("hot_cold"), "hot_cold")
+    if hot_cold.get("mode"):
+        store = _filtered_store(version, _object(body.get("filters"), "filters"))
+        freq, miss = freq_table(store), miss_table(store)
+        t = float(hot_cold.get("temperature", 1.0))
+        kwargs["front_num_weights"] = number_weights(freq["front"].to_dict(), miss["front"].to_dict(), hot_cold["mode"], t)
+        kwargs["back_num_weights"] = number_weights(freq["back"].to_dict(), miss["back"].to_dict(), hot_cold["mode"], t)
+    tickets = gen_numbers(
+        count=count,
+        rules=_object(body.get("rules"), "rules"),
+        rng=random.Random(body.get("seed")),
+        front_pool_user=body.get("front_pool"),
+        back_pool_user=body.get("back_pool"),
+        **kwargs,
+    )
+    return _dump({"version": version, "tickets": tickets})
+
+def score_payload(body:Dict) -> bytes:
+    win_front, win_back = body.get("win_front") or [], body.get("win_back") or []
+    prizes = [check_prize(t["front"], t["back"], win_front, win_back) for t in body.get("tickets") or []]
+    return _dump({"prizes": prizes})
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "dlt-api/1.0"
+    timeout = 30  # keep-alive 空闲超时（秒）
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status:int, body:bytes=b"", etag:Optional[str]=None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if status != 304:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def _error(self, status:int, msg:str):
+        self._send(status, _dump({"error": msg}))
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        handlers = {"/draws": draws_payload, "/stats": stats_payload}
+        if url.path == "/version":
+            return self._send(200, _dump({"version": data_version(), "cache": cache.stats()}))
+        if url.path not in handlers:
+            return self._error(404, f"未知路径: {url.path}")
+        version = data_version()
+        key = tuple(sorted(params.items()))
+        etag = _etag(version, url.path, key)
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, etag=etag)
+        try:
+            with self.server.slots:
+                body = cache.get_or_compute((url.path, version, key), lambda: handlers[url.path](version, params))
+        except (ValueError, KeyError, TypeError) as e:
+            return self._error(400, str(e))
+        self._send(200, body, etag=etag)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as e:
+            return self._error(400, f"请求体不是合法 JSON: {e}")
+        if not isinstance(body, dict):
+            return self._error(400, "请求体须为 JSON 对象")
+        try:
+            with self.server.slots:
+                return self._post(url.path, body)
+        except (ValueError, KeyError, TypeError) as e:
+            return self._error(400, str(e))
+
+    def _post(self, path:str, body:Dict):
+        if path == "/generate":
+            version = data_version()
+            if body.get("seed") is None:
+                return self._send(200, generate_payload(version, body))
+            key = ("/generate", version, json.dumps(body, sort_keys=True))
+            return self._send(200, cache.get_or_compute(key, lambda: generate_payload(version, body)))
+        if path == "/score":
+            return self._send(200, score_payload(body))
+        self._error(404, f"未知路径: {path}")
+
+class ApiHTTPServer(ThreadingHTTPServer):
+    """
+    每个连接一个线程（keep-alive 连接不会占住计算名额），
+    实际计算并发由 workers 个信号量名额限制；所有线程共享同一进程内缓存。
+    """
+    daemon_threads = True
+
+    def __init__(self, addr, handler, workers:int=8, verbose:bool=False):
+        super().__init__(addr, handler)
+        self.slots = threading.BoundedSemaphore(workers)
+        self.verbose = verbose
+
+def serve(host:str="127.0.0.1", port:int=8765, workers:int=8, cache_size:int=256, verbose:bool=False):
+    cache.maxsize = cache_size
+    httpd = ApiHTTPServer((host, port), Handler, workers=workers, verbose=verbose)
+    print(f"dlt-api 监听 http://{host}:{port}（计算并发 {workers}）")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="大乐透本地 HTTP API 服务")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--cache-size", type=int, default=256)
+    ap.add_argument("--verbose", action="store_true")
+    a = ap.parse_args()
+    serve(a.host, a.port, a.workers, a.cache_size, a.verbose)
@@ -0,0 +1,292 @@
+"""
+蒙特卡洛策略模拟：估计一组投注（固定号码本或 gen_numbers 规则）的长期派奖分布、方差与破产风险。
+
+- 每个任务使用独立的 SeedSequence 子流，相同 seed 的结果与进程数无关
+- 开奖按批向量化生成，号码编码为位掩码，命中个数用 popcount 计算
+- 结果只保留流式聚合量（计数/均值/M2/极值/奖级计数），内存与模拟期数无关
+- 一、二等奖为浮动奖，默认按 PRIZE_AMOUNTS 的参考值计；固定奖级的返奖率另行给出
+
+命令行：
+  python -m backend.simulate --draws 1000000 --workers 4
+  python -m backend.simulate --book book.csv --prize 一等奖=5000000 --prize 二等奖=80000
+  python -m backend.simulate --count 10 --sum-min 70 --sum-max 140 --odd 3 --bankroll 2000
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+import math
+import os
+import random
+import numpy as np
+
+from .generator import gen_numbers
+from .prize import FLOATING_LEVELS, PRIZE_LEVELS, PRIZE_AMOUNTS, TICKET_PRICE, prize_table, resolve_level
+
+FRONT_N, FRONT_K = 35, 5
+BACK_N, BACK_K = 12, 2
+CELL_BUDGET = 1 << 20   # 单批 开奖数×max(注数, 前区号码数) 上限，控制每批内存
+MAX_TASKS = 64          # 任务数固定上限，保证可复现性不依赖 workers
+
+_TIER_TABLE = np.array(prize_table(), dtype=np.int8)
+
+if hasattr(np, "bitwise_count"):
+    def popcount(x:np.ndarray) -> np.ndarray:
+        return np.bitwise_count(x)
+else:  # numpy < 2.0
+    _POP8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+    def popcount(x:np.ndarray) -> np.ndarray:
+        b = np.ascontiguousarray(x, dtype=np.int64)
+        return _POP8[b.view(np.uint8)].reshape(b.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+def encode_mask(nums:Iterable[int]) -> int:
+    m = 0
+    for n in nums:
+        m |= 1 << int(n)
+    return m
+
+def encode_book(tickets:List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """号码本 [{"front":[...],"back":[...]}] -> (前区掩码, 后区掩码)，bit n 表示号码 n"""
+    front = np.array([encode_mask(t["front"]) for t in tickets], dtype=np.int64)
+    back = np.array([encode_mask(t["back"]) for t in tickets], dtype=np.int64)
+    return front, back
+
+def random_masks(rng:np.random.Generator, size:int, n:int, k:int) -> np.ndarray:
+    """向量化生成 size 期从 1..n 中不放回抽 k 个号码的开奖掩码"""
+    keys = rng.random((size, n))
+    idx = np.argpartition(keys, k - 1, axis=1)[:, :k] + 1
+    return (np.int64(1) << idx.astype(np.int64)).sum(axis=1)
+
+def score_batch(draw_front:np.ndarray, draw_back:np.ndarray,
+                book_front:np.ndarray, book_back:np.ndarray) -> np.ndarray:
+    """返回 (期数, 注数) 的奖级编号矩阵"""
+    fc = popcount(draw_front[:, None] & book_front[None, :])
+    bc = popcount(draw_back[:, None] & book_back[None, :])
+    return _TIER_TABLE[fc, bc]
+
+@dataclass
+class _Agg:
+    """可合并的流式聚合（Chan 并行方差合并）"""
+    n: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+    hit_draws: int = 0
+    tier_counts: np.ndarray = field(default_factory=lambda: np.zeros(len(PRIZE_LEVELS), dtype=np.int64))
+    paths: int = 0
+    ruined: int = 0
+
+    def add(self, payouts:np.ndarray, tiers:np.ndarray) -> None:
+        n = payouts.size
+        if n == 0:
+            return
+        mean = float(payouts.mean())
+        m2 = float(((payouts - mean) ** 2).sum())
+        self._merge_moments(n, mean, m2)
+        self.min = min(self.min, float(payouts.min()))
+        self.max = max(self.max, float(payouts.max()))
+        self.hit_draws += int((payouts > 0).sum())
+        self.tier_counts += np.bincount(tiers.ravel(), minlength=len(PRIZE_LEVELS))
+
+    def merge(self, other:"_Agg") -> None:
+        if other.n:
+            self._merge_moments(other.n, other.mean, other.m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.hit_draws += other.hit_draws
+        self.tier_counts += other.tier_counts
+        self.paths += other.paths
+        self.ruined += other.ruined
+
+    def _merge_moments(self, n:int, mean:float, m2:float) -> None:
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+
+@dataclass
+class SimResult:
+    draws: int
+    tickets: int
+    cost_per_draw: float
+    mean_payout: float
+    variance: float
+    min_payout: float
+    max_payout: float
+    hit_rate: float
+    tier_counts: Dict[str, int]
+    horizon: int
+    bankroll: Optional[float]
+    paths: int
+    risk_of_ruin: Optional[float]
+    prize_amounts: Dict[str, float]
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def expected_return(self) -> float:
+        """每投入 1 元的期望返奖"""
+        return self.mean_payout / self.cost_per_draw if self.cost_per_draw else 0.0
+
+    @property
+    def fixed_return(self) -> float:
+        """只计固定奖级（不含浮动的一、二等奖）的每 1 元期望返奖"""
+        cost = self.draws * self.cost_per_draw
+        fixed = sum(c * self.prize_amounts[p] for p, c in self.tier_counts.items() if p not in FLOATING_LEVELS)
+        return fixed / cost if cost else 0.0
+
+    def tier_probs(self) -> Dict[str, float]:
+        total = self.draws * self.tickets
+        return {k: v / total for k, v in self.tier_counts.items()} if total else {}
+
+def _run_task(args) -> _Agg:
+    seed_seq, book_front, book_back, amounts, n_paths, horizon, bankroll = args
+    rng = np.random.default_rng(seed_seq)
+    k = book_front.size
+    cost = float(k * TICKET_PRICE)
+    # 每期开奖生成需 (FRONT_N,) 的随机键与排序下标，注数很少时按号码数而非注数定批量
+    rows = max(1, CELL_BUDGET // max(k, FRONT_N))
+    step = min(horizon, rows)
+    group = max(1, rows // step)
+    agg = _Agg()
+
+    for g0 in range(0, n_paths, group):
+        p = min(group, n_paths - g0)
+        bank = np.full(p, float(bankroll) if bankroll is not None else 0.0)
+        ruined = np.zeros(p, dtype=bool)
+        for t0 in range(0, horizon, step):
+            s = min(step, horizon - t0)
+            df_ = random_masks(rng, p * s, FRONT_N, FRONT_K)
+            db_ = random_masks(rng, p * s, BACK_N, BACK_K)
+            tiers = score_batch(df_, db_, book_front, book_back)
+            payouts = amounts[tiers].sum(axis=1)
+            agg.add(payouts, tiers)
+            if bankroll is not None:
+                # 余额低于一期投注成本即视为破产（之后的路径不再影响标记）
+                path = bank[:, None] + np.cumsum(payouts.reshape(p, s) - cost, axis=1)
+                ruined |= (path < cost).any(axis=1)
+                bank = path[:, -1]
+        agg.paths += p
+        agg.ruined += int(ruined.sum())
+    return agg
+
+def book_from_rules(count:int=5, rules:Optional[Dict]=None, seed:Optional[int]=None, **gen_kwargs) -> List[Dict]:
+    """按 gen_numbers 规则生成一套固定号码本"""
+    return gen_numbers(count=count, rules=rules, rng=random.Random(seed), **gen_kwargs)
+
+def simulate_strategy(
+    tickets: Optional[List[Dict]] = None,
+    rules: Optional[Dict] = None,
+    count: int = 5,
+    gen_kwargs: Optional[Dict] = None,
+    n_draws: int = 1_000_000,
+    horizon: int = 1000,
+    bankroll: Optional[float] = None,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+    prize_amounts: Optional[Dict[str, float]] = None,
+) -> SimResult:
+    """
+    模拟策略在 n_draws 期随机开奖下的表现。
+    - tickets：固定号码本；为空时按 rules（及 gen_kwargs）用 gen_numbers 生成 count 注
+    - horizon：每条资金路径的期数；n_draws 向上取整为 horizon 的整数倍
+    - bankroll：初始资金，给定时统计破产概率（余额不足一期投注成本）
+    - workers：进程数，默认 CPU 核数；1 表示在当前进程内运行
+    - prize_amounts：按奖级（全名或 "二等奖" 这样的前缀）覆盖 PRIZE_AMOUNTS 中的单注奖金
+    """
+    if tickets is None:
+        tickets = book_from_rules(count, rules, seed, **(gen_kwargs or {}))
+    if not tickets:
+        raise ValueError("号码本为空")
+    book_front, book_back = encode_book(tickets)
+    amounts_by_level = {**PRIZE_AMOUNTS, **{resolve_level(k): float(v) for k, v in (prize_amounts or {}).items()}}
+    amounts = np.array([amounts_by_level[p] for p in PRIZE_LEVELS], dtype=np.float64)
+
+    horizon = max(1, int(horizon))
+    n_paths = max(1, -(-int(n_draws) // horizon))
+    n_tasks = min(n_paths, MAX_TASKS)
+    seeds = np.random.SeedSequence(seed).spawn(n_tasks)
+    base, extra = divmod(n_paths, n_tasks)
+    tasks = [(seeds[i], book_front, book_back, amounts, base + (1 if i < extra else 0), horizon, bankroll)
+             for i in range(n_tasks)]
+
+    workers = workers or os.cpu_count() or 1
+    total = _Agg()
+    if workers <= 1:
+        for t in tasks:
+            total.merge(_run_task(t))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, n_tasks)) as ex:
+            for agg in ex.map(_run_task, tasks):
+                total.merge(agg)
+
+    return SimResult(
+        draws=total.n,
+        tickets=len(tickets),
+        cost_per_draw=float(len(tickets) * TICKET_PRICE),
+        mean_payout=total.mean,
+        variance=total.m2 / total.n if total.n else 0.0,
+        min_payout=total.min,
+        max_payout=total.max,
+        hit_rate=total.hit_draws / total.n if total.n else 0.0,
+        tier_counts={p: int(c) for p, c in zip(PRIZE_LEVELS, total.tier_counts)},
+        horizon=horizon,
+        bankroll=bankroll,
+        paths=total.paths,
+        risk_of_ruin=(total.ruined / total.paths) if bankroll is not None and total.paths else None,
+        prize_amounts=amounts_by_level,
+    )
+
+def load_book(path:str) -> List[Dict]:
+    """读取号码本文件（backend.export 导出的 f1..f5,b1,b2 列，CSV / gzip-CSV / Parquet）"""
+    import pandas as pd
+    df = pd.read_parquet(path) if path.lower().endswith((".parquet", ".pq")) else pd.read_csv(path)
+    nums = df[["f1", "f2", "f3", "f4", "f5", "b1", "b2"]].to_numpy(dtype=int).tolist()
+    return [{"front": row[:5], "back": row[5:]} for row in nums]
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="大乐透策略蒙特卡洛模拟")
+    ap.add_argument("--draws", type=float, default=1e6)
+    ap.add_argument("--book", help="固定号码本文件（CSV / .csv.gz / Parquet，列 f1..f5,b1,b2）")
+    ap.add_argument("--count", type=int, default=5, help="未给 --book 时按规则生成的注数")
+    ap.add_argument("--sum-min", type=int)
+    ap.add_argument("--sum-max", type=int)
+    ap.add_argument("--odd", type=int, help="前区奇数个数")
+    ap.add_argument("--prize", action="append", default=[], metavar="奖级=金额",
+                    help="覆盖单注奖金，如 --prize 一等奖=5000000 --prize 二等奖=80000，可重复")
+    ap.add_argument("--horizon", type=int, default=1000)
+    ap.add_argument("--bankroll", type=float, default=None)
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--workers", type=int, default=None)
+    a = ap.parse_args()
+
+    rules: Dict = {}
+    if a.sum_min is not None or a.sum_max is not None:
+        rules["sum_front_range"] = [a.sum_min, a.sum_max]
+    if a.odd is not None:
+        rules["odd_even_front"] = [a.odd, 5 - a.odd]
+    prizes: Dict[str, float] = {}
+    for item in a.prize:
+        name, sep, amount = item.partition("=")
+        if not sep:
+            ap.error(f"--prize 格式应为 奖级=金额: {item}")
+        try:
+            prizes[resolve_level(name.strip())] = float(amount)
+        except ValueError as e:
+            ap.error(str(e))
+    r = simulate_strategy(tickets=load_book(a.book) if a.book else None, rules=rules, count=a.count,
+                          n_draws=int(a.draws), horizon=a.horizon, bankroll=a.bankroll, seed=a.seed,
+                          workers=a.workers, prize_amounts=prizes)
+    print(f"模拟 {r.draws} 期 × {r.tickets} 注，每期成本 {r.cost_per_draw:.0f} 元")
+    print(f"每期平均返奖 {r.mean_payout:.4f}，标准差 {r.std:.2f}，返奖率 {r.expected_return:.2%}，中奖期占比 {r.hit_rate:.2%}")
+    print(f"其中固定奖级返奖率 {r.fixed_return:.2%}；浮动奖按 "
+          + "、".join(f"{p.split(' ')[0]} {r.prize_amounts[p]:,.0f} 元" for p in FLOATING_LEVELS) + " 计")
+    for p, c in r.tier_counts.items():
+        print(f"  {p}: {c}")
+    if r.risk_of_ruin is not None:
+        print(f"初始资金 {r.bankroll:.0f}、{r.horizon} 期内破产概率 {r.risk_of_ruin:.2%}")
@@ -0,0 +1,168 @@
+# backend/stats.py
+"""
+开奖历史的随机性检验：卡方均匀性、最热号码、和值游程、间隔、和值序列相关。
+p 值由蒙特卡洛得到：按批向量化生成与实际等长的合成历史（真随机开奖），
+在进程池中计算同一组统计量，p = (1 + 模拟统计量 ≥ 观测值的次数) / (1 + 模拟次数)。
+结果按输入历史的内容摘要缓存。
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+import hashlib
+import math
+import os
+import numpy as np
+import pandas as pd
+
+from .cache import ResultCache
+
+FRONT_N, FRONT_K = 35, 5
+BACK_N, BACK_K = 12, 2
+CELL_BUDGET = 1 << 21   # 单批 模拟历史数×期数×号码数 上限
+N_TASKS = 16            # 任务数固定，保证同一 seed 的结果与进程数无关
+
+TESTS: List[Tuple[str, str]] = [
+    ("前区卡方均匀性", "各号码出现次数与均匀分布的卡方值"),
+    ("后区卡方均匀性", "各号码出现次数与均匀分布的卡方值"),
+    ("前区最热号码", "出现次数最多的前区号码的次数"),
+    ("和值游程检验", "前区和值高于/低于中位数序列的游程 |z|"),
+    ("前区间隔检验", "号码两次出现之间的间隔与几何分布的卡方值"),
+    ("和值序列相关", "相邻两期前区和值的一阶自相关 |r|"),
+]
+
+_cache = ResultCache(maxsize=32)
+
+def hits_from_numbers(nums:np.ndarray, n:int) -> np.ndarray:
+    """(期数, k) 号码 -> (1, 期数, n) 布尔命中矩阵"""
+    hits = np.zeros((len(nums), n + 1), dtype=bool)
+    hits[np.arange(len(nums))[:, None], nums] = True
+    return hits[None, :, 1:]
+
+def random_hits(rng:np.random.Generator, batch:int, length:int, n:int, k:int) -> np.ndarray:
+    """(batch, length, n) 布尔命中矩阵，每期从 n 个号码中不放回抽 k 个"""
+    keys = rng.random((batch, length, n), dtype=np.float32)
+    idx = np.argpartition(keys, k - 1, axis=-1)[..., :k]
+    hits = np.zeros((batch, length, n), dtype=bool)
+    np.put_along_axis(hits, idx, True, axis=-1)
+    return hits
+
+def _chi2_uniform(hits:np.ndarray, k:int) -> np.ndarray:
+    counts = hits.sum(axis=1)
+    e = hits.shape[1] * k / hits.shape[2]
+    return ((counts - e) ** 2 / e).sum(axis=1)
+
+def _runs_z(s:np.ndarray) -> np.ndarray:
+    n = s.shape[1]
+    above = s > np.median(s, axis=1, keepdims=True)
+    n1 = above.sum(axis=1).astype(np.float64)
+    n2 = n - n1
+    runs = 1 + (above[:, 1:] != above[:, :-1]).sum(axis=1)
+    mu = 2 * n1 * n2 / n + 1
+    var = 2 * n1 * n2 * (2 * n1 * n2 - n) / (n * n * (n - 1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(var > 0, (runs - mu) / np.sqrt(var), 0.0)
+    return np.abs(z)
+
+def _gap_chi2(hits:np.ndarray, k:int) -> np.ndarray:
+    b, n, m = hits.shape
+    p = k / m
+    K = max(1, math.ceil(math.log(0.05) / math.log(1 - p)))  # 尾部桶期望占比约 5%
+    t = np.arange(n, dtype=np.int32)[None, :, None]
+    last = np.maximum.accumulate(np.where(hits, t, -1), axis=1)
+    prev = np.concatenate([np.full((b, 1, m), -1, dtype=last.dtype), last[:, :-1]], axis=1)
+    mask = hits & (prev >= 0)
+    bi = np.nonzero(mask)[0]
+    gaps = np.minimum((t - prev - 1)[mask], K)
+    obs = np.bincount(bi * (K + 1) + gaps, minlength=b * (K + 1)).reshape(b, K + 1)
+    probs = np.append(p * (1 - p) ** np.arange(K), (1 - p) ** K)
+    exp = obs.sum(axis=1, keepdims=True) * probs[None, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(exp > 0, (obs - exp) ** 2 / exp, 0.0).sum(axis=1)
+
+def _serial_r(s:np.ndarray) -> np.ndarray:
+    x, y = s[:, :-1], s[:, 1:]
+    x = x - x.mean(axis=1, keepdims=True)
+    y = y - y.mean(axis=1, keepdims=True)
+    den = np.sqrt((x * x).sum(axis=1) * (y * y).sum(axis=1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.abs(np.where(den > 0, (x * y).sum(axis=1) / den, 0.0))
+
+def batch_statistics(hf:np.ndarray, hb:np.ndarray) -> np.ndarray:
+    """一批历史（前区 hf、后区 hb 命中矩阵）的全部统计量，形状 (批, 检验数)，顺序同 TESTS"""
+    s = hf @ np.arange(1, FRONT_N + 1, dtype=np.float32)
+    return np.stack([
+        _chi2_uniform(hf, FRONT_K),
+        _chi2_uniform(hb, BACK_K),
+        hf.sum(axis=1).max(axis=1).astype(np.float64),
+        _runs_z(s),
+        _gap_chi2(hf, FRONT_K),
+        _serial_r(s),
+    ], axis=1)
+
+def _mc_task(args) -> Tuple[np.ndarray, np.ndarray]:
+    seed_seq, length, n_sims, observed = args
+    rng = np.random.default_rng(seed_seq)
+    batch = max(1, CELL_BUDGET // (length * FRONT_N))
+    exceed = np.zeros(len(observed), dtype=np.int64)
+    total = np.zeros(len(observed), dtype=np.float64)
+    done = 0
+    while done < n_sims:
+        b = min(batch, n_sims - done)
+        st = batch_statistics(random_hits(rng, b, length, FRONT_N, FRONT_K),
+                              random_hits(rng, b, length, BACK_N, BACK_K))
+        exceed += (st >= observed[None, :] - 1e-9).sum(axis=0)
+        total += st.sum(axis=0)
+        done += b
+    return exceed, total
+
+def run_tests(front:np.ndarray, back:np.ndarray, n_sims:int=1000, seed:Optional[int]=0,
+              workers:Optional[int]=None) -> pd.DataFrame:
+    """
+    front (期数, 5)、back (期数, 2) 须按时间顺序排列。
+    返回每项检验的观测统计量、模拟均值与蒙特卡洛 p 值。
+    """
+    length = len(front)
+    observed = batch_statistics(hits_from_numbers(front, FRONT_N), hits_from_numbers(back, BACK_N))[0]
+
+    n_tasks = max(1, min(N_TASKS, n_sims))
+    seeds = np.random.SeedSequence(seed).spawn(n_tasks)
+    base, extra = divmod(n_sims, n_tasks)
+    tasks = [(seeds[i], length, base + (1 if i < extra else 0), observed) for i in range(n_tasks)]
+
+    workers = workers or os.cpu_count() or 1
+    exceed = np.zeros(len(observed), dtype=np.int64)
+    total = np.zeros(len(observed), dtype=np.float64)
+    if workers <= 1:
+        results = map(_mc_task, tasks)
+    else:
+        ex = ProcessPoolExecutor(max_workers=min(workers, n_tasks))
+        results = ex.map(_mc_task, tasks)
+    try:
+        for e, t in results:
+            exceed += e
+            total += t
+    finally:
+        if workers > 1:
+            ex.shutdown()
+
+    p = (1 + exceed) / (1 + n_sims)
+    return pd.DataFrame({
+        "检验": [name for name, _ in TESTS],
+        "说明": [desc for _, desc in TESTS],
+        "统计量": observed.round(4),
+        "模拟均值": (total / max(n_sims, 1)).round(4),
+        "p 值": p.round(4),
+        "结论": np.where(p < 0.05, "显著偏离随机", "与随机一致"),
+    })
+
+def randomness_tests(df:pd.DataFrame, n_sims:int=1000, seed:Optional[int]=0,
+                     workers:Optional[int]=None) -> pd.DataFrame:
+    """对 dataframe_from_draws 风格的 DataFrame 运行全部检验，按输入内容摘要缓存"""
+    if len(df) < 3:
+        return pd.DataFrame(columns=["检验", "说明", "统计量", "模拟均值", "p 值", "结论"])
+    order = np.argsort(df["issue"].astype(int).to_numpy(), kind="stable")
+    front = df[["f1","f2","f3","f4","f5"]].to_numpy(dtype=np.int64)[order]
+    back = df[["b1","b2"]].to_numpy(dtype=np.int64)[order]
+    digest = hashlib.sha1(front.tobytes() + back.tobytes()).hexdigest()
+    key = (digest, n_sims, seed)
+    return _cache.get_or_compute(key, lambda: run_tests(front, back, n_sims, seed, workers))
@@ -0,0 +1,136 @@
+# backend/store.py
+"""
+紧凑的开奖历史存储：一次原生 SQL 读取到 NumPy 结构化数组，绕过 ORM 对象与逐行 dict。
+每期占 15 字节（期号 int32 + 日期天数 int32 + 7 个 int8 号码），列访问均为零拷贝视图；
+freq_table / miss_table / block_hit_matrix 可直接读取这些视图。
+销量/奖池字符串只在访问 sales / pool 或 to_frame 时按需读取。
+"""
+from __future__ import annotations
+from itertools import chain
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+from .db import engine, init_db
+
+DRAW_DTYPE = np.dtype([
+    ("issue", "<i4"),            # 期号，如 25101
+    ("date", "<i4"),             # 开奖日期，距 1970-01-01 的天数
+    ("front", "i1", (5,)),       # 前区
+    ("back", "i1", (2,)),        # 后区
+])
+ISSUE_WIDTH = 5  # 期号固定 5 位（YYNNN），转回字符串时补零
+
+_NUM_COLS = ("CAST(issue AS INTEGER), CAST(julianday(date) - 2440587.5 AS INTEGER), "
+             "f1, f2, f3, f4, f5, b1, b2")
+
+class DrawStore:
+    __slots__ = ("data", "_sales", "_pool")
+
+    def __init__(self, data:np.ndarray, sales:Optional[np.ndarray]=None, pool:Optional[np.ndarray]=None):
+        self.data = data
+        self._sales = sales
+        self._pool = pool
+
+    @classmethod
+    def load(cls) -> "DrawStore":
+        """按期号倒序读取全部开奖的数值列；游标逐行直接写入 int32 数组，不经过整表的元组列表"""
+        init_db()
+        conn = engine.raw_connection()
+        try:
+            cur = conn.cursor()
+            cur.execute(f"SELECT {_NUM_COLS} FROM draws ORDER BY issue DESC")
+            num = np.fromiter(chain.from_iterable(cur), dtype=np.int32).reshape(-1, 9)
+        finally:
+            conn.close()
+        return cls(cls._pack(num))
+
+    def _load_meta(self) -> None:
+        init_db()
+        conn = engine.raw_connection()
+        try:
+            rows = conn.cursor().execute("SELECT CAST(issue AS INTEGER), sales, pool FROM draws").fetchall()
+        finally:
+            conn.close()
+        meta = {r[0]: (r[1] or "", r[2] or "") for r in rows}
+        self._sales = np.array([meta.get(int(i), ("", ""))[0] for i in self.issue], dtype=object)
+        self._pool = np.array([meta.get(int(i), ("", ""))[1] for i in self.issue], dtype=object)
+
+    @property
+    def sales(self) -> np.ndarray:
+        """销量字符串（首次访问时读取）"""
+        if self._sales is None:
+            self._load_meta()
+        return self._sales
+
+    @property
+    def pool(self) -> np.ndarray:
+        """奖池字符串（首次访问时读取）"""
+        if self._pool is None:
+            self._load_meta()
+        return self._pool
+
+    @staticmethod
+    def _pack(num:np.ndarray) -> np.ndarray:
+        data = np.empty(len(num), dtype=DRAW_DTYPE)
+        data["issue"] = num[:, 0]
+        data["date"] = num[:, 1]
+        data["front"] = num[:, 2:7]
+        data["back"] = num[:, 7:9]
+        return data
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    # ---- 零拷贝列视图 ----
+    @property
+    def issue(self) -> np.ndarray:
+        return self.data["issue"]
+
+    @property
+    def date(self) -> np.ndarray:
+        return self.data["date"]
+
+    @property
+    def front(self) -> np.ndarray:
+        """(期数, 5) 前区号码视图"""
+        return self.data["front"]
+
+    @property
+    def back(self) -> np.ndarray:
+        """(期数, 2) 后区号码视图"""
+        return self.data["back"]
+
+    # ---- 转换 ----
+    @property
+    def dates(self) -> np.ndarray:
+        return self.date.astype("datetime64[D]")
+
+    @property
+    def issue_str(self) -> np.ndarray:
+        if len(self) == 0:
+            return np.empty(0, dtype=object)
+        return np.char.zfill(self.issue.astype(str), ISSUE_WIDTH).astype(object)
+
+    def take(self, idx) -> "DrawStore":
+        """按布尔掩码或下标取子集"""
+        return DrawStore(self.data[idx],
+                         self._sales[idx] if self._sales is not None else None,
+                         self._pool[idx] if self._pool is not None else None)
+
+    def to_frame(self, with_meta:bool=True) -> pd.DataFrame:
+        """与 dataframe_from_draws 输入同列的 DataFrame（号码列为 int）；with_meta=False 时不含销量/奖池"""
+        cols = {"issue": self.issue_str, "date": pd.to_datetime(self.dates)}
+        front, back = self.front, self.back
+        for i in range(5):
+            cols[f"f{i+1}"] = front[:, i].astype(int)
+        for i in range(2):
+            cols[f"b{i+1}"] = back[:, i].astype(int)
+        if with_meta:
+            cols["sales"] = self.sales
+            cols["pool"] = self.pool
+        return pd.DataFrame(cols)
@@ -5,6 +5,7 @@ from .db import init_db, session_scope, Draw
 from .dlt import iter_history, normalize_row
 from datetime import datetime
 import csv
+import gzip
 from .db import session_scope, Draw, init_db
 
 def upsert_from_source(progress_callback=None) -> int:
@@ -45,10 +46,18 @@ def import_csv(file) -> int:
     init_db()
     added = 0
 
+    # 支持 backend.export 导出的 gzip-CSV
     if isinstance(file, str):
-        f = open(file, "r", encoding="utf-8-sig")
+        if file.lower().endswith(".gz"):
+            f = gzip.open(file, "rt", encoding="utf-8-sig", newline="")
+        else:
+            f = open(file, "r", encoding="utf-8-sig")
     else:
         import io
+        head = file.read(2)
+        file.seek(0)
+        if head == b"\x1f\x8b":
+            file = gzip.GzipFile(fileobj=file)
         f = io.TextIOWrapper(file, encoding="utf-8-sig")
 
     with session_scope() as s: